@@ -240,7 +240,8 @@ _TYPE_FILLS = {
 
 
 def generate_mapping_report(excel_path, sheet_names=None,
-                            config_path=None, output_path=None):
+                            config_path=None, output_path=None,
+                            dry_run=False, classified=None):
     """Generate the mapping report Excel file.
 
     Produces one sheet per source sheet with a flat tabular layout
@@ -257,17 +258,31 @@ def generate_mapping_report(excel_path, sheet_names=None,
     output_path : str or None
         Where to write the report.  Defaults to
         ``<excel_dir>/output/mapping_report.xlsx``.
+    dry_run : bool
+        When ``True`` the report is built but not serialised, and nothing
+        is written at the output path (an existing report is left as it
+        is).  Useful when only the output location matters.
+    classified : tuple or None
+        Pre-computed ``(sheets, tables, formula_cells, hardcoded_cells)``
+        for *excel_path*, as returned by :func:`parse_workbook` and
+        :func:`classify_cells`.  When given, the source workbook is not
+        re-opened.
 
     Returns
     -------
     str
-        Path to the generated report file.
+        Path to the generated report file (on a dry run, the path it
+        would have been written to).
     """
     config = load_config(config_path)
 
-    wb_src = load_workbook(excel_path)
-    sheets, tables = parse_workbook(wb_src)
-    formula_cells, hardcoded_cells = classify_cells(sheets, tables)
+    if classified is None:
+        wb_src = load_workbook(excel_path)
+        sheets, tables = parse_workbook(wb_src)
+        formula_cells, hardcoded_cells = classify_cells(sheets, tables)
+        wb_src.close()
+    else:
+        sheets, tables, formula_cells, hardcoded_cells = classified
 
     if sheet_names is None:
         sheet_names = list(sheets.keys())
@@ -342,8 +357,9 @@ def generate_mapping_report(excel_path, sheet_names=None,
     if has_default and "Sheet" in wb_report.sheetnames and len(wb_report.sheetnames) > 1:
         del wb_report["Sheet"]
 
-    wb_report.save(output_path)
-    wb_src.close()
-
-    print(f"Generated mapping report: {output_path}")
+    if dry_run:
+        print(f"Dry run, mapping report not written: {output_path}")
+    else:
+        wb_report.save(output_path)
+        print(f"Generated mapping report: {output_path}")
     return output_path
@@ -129,9 +129,9 @@ def _generate_ext_config(external_files, output_path):
 # Analysis report
 # ------------------------------------------------------------------
 
-def _generate_report(analysis, formula_cells, groups, singles,
-                     sheets, external_files, output_path):
-    """Create an Excel report with reference analysis."""
+def _build_report(analysis, formula_cells, groups, singles,
+                  sheets, external_files):
+    """Build the reference-analysis report as an in-memory workbook."""
     wb = Workbook()
     if "Sheet" in wb.sheetnames:
         del wb["Sheet"]
@@ -261,16 +261,39 @@ def _generate_report(analysis, formula_cells, groups, singles,
     for ci in range(1, len(ps_headers) + 1):
         ws_ps.column_dimensions[get_column_letter(ci)].width = 22
 
+    return wb
+
+
+def _generate_report(analysis, formula_cells, groups, singles,
+                     sheets, external_files, output_path):
+    """Create an Excel report with reference analysis."""
+    wb = _build_report(analysis, formula_cells, groups, singles,
+                       sheets, external_files)
     wb.save(output_path)
     return output_path
 
 
+def _summarise_report(analysis, formula_cells, groups, singles,
+                      sheets, external_files):
+    """Map each report sheet to the value in its first data row (``A2``).
+
+    Builds the same workbook as :func:`_generate_report` but never
+    serialises it.
+    """
+    wb = _build_report(analysis, formula_cells, groups, singles,
+                       sheets, external_files)
+    return {ws.title: ws["A2"].value for ws in wb.worksheets}
+
+
 # ------------------------------------------------------------------
 # Main entry point
 # ------------------------------------------------------------------
 
+_REPORT_MODES = ("workbook", "sheetnames_only")
+
+
 def convert_excel_to_python_vectorized(excel_path, config_path=None,
-                                       output_dir=None):
+                                       output_dir=None, report_mode="workbook"):
     """Convert an Excel workbook to a vectorised Python script.
 
     Produces:
@@ -281,7 +304,13 @@ def convert_excel_to_python_vectorized(excel_path, config_path=None,
       * ``analysis_report.xlsx``   – reference analysis report
 
     Returns (script_path, template_path, config_path_or_None, report_path).
+    With ``report_mode="sheetnames_only"`` the report is not written and
+    report_path is replaced by a dict mapping each report sheet name to
+    the value in that sheet's cell ``A2``.
     """
+    if report_mode not in _REPORT_MODES:
+        raise ValueError(f"report_mode must be one of {_REPORT_MODES}, "
+                         f"got {report_mode!r}")
     config = load_config(config_path)
     delete_unreferenced = config.get("delete_unreferenced_hardcoded_values", False)
 
@@ -330,9 +359,13 @@ def convert_excel_to_python_vectorized(excel_path, config_path=None,
         _generate_ext_config(external_files, ext_config_path)
 
     # --- report ---
-    report_path = os.path.join(output_dir, "analysis_report.xlsx")
-    _generate_report(analysis, formula_cells, groups, singles,
-                     sheets, external_files, report_path)
+    report_args = (analysis, formula_cells, groups, singles,
+                   sheets, external_files)
+    if report_mode == "sheetnames_only":
+        report = _summarise_report(*report_args)
+    else:
+        report = os.path.join(output_dir, "analysis_report.xlsx")
+        _generate_report(*report_args, report)
 
     wb.close()
 
@@ -340,7 +373,8 @@ def convert_excel_to_python_vectorized(excel_path, config_path=None,
     print(f"Generated input template    : {template_path}")
     if ext_config_path:
         print(f"Generated external config   : {ext_config_path}")
-    print(f"Generated analysis report   : {report_path}")
+    if report_mode == "workbook":
+        print(f"Generated analysis report   : {report}")
     print(f"\nTo run: python {script_path} {template_path} <output.xlsx>")
 
-    return script_path, template_path, ext_config_path, report_path
+    return script_path, template_path, ext_config_path, report
@@ -8,6 +8,8 @@ instead of one line per cell.
 Also detects external workbook references ([Book.xlsx]Sheet!Cell).
 """
 
+import bisect
+import functools
 import re
 from collections import defaultdict
 
@@ -63,6 +65,24 @@ _LOCAL_CELL_PATTERN = re.compile(
 # Table structured reference – not vectorized specially
 _TABLE_REF_PATTERN = re.compile(r"(\w+)\[([^\]]*)\]")
 
+# All reference shapes in one alternation, most specific first, so a
+# formula is tokenised in a single left-to-right pass.  Same-sheet refs
+# must not continue an identifier (function name, table name, "$" of a
+# rejected ref).  The outer named group tells which shape matched; its
+# sub-groups follow it in group numbering.  No re.ASCII, here or in the
+# shape patterns: cell coordinates are ASCII but sheet names are not, and
+# =Données!A1 needs \w (and the [^\W\d] letter guard) to accept "é".
+_REFERENCE_PATTERN = re.compile(
+    "|".join(f"{guard}(?P<{name}>{pat.pattern})" for name, guard, pat in (
+        ("ext_range", "", _EXT_RANGE_PATTERN),
+        ("ext_cell", "", _EXT_CELL_PATTERN),
+        ("int_range", "", _INT_RANGE_PATTERN),
+        ("int_cell", "", _INT_CELL_PATTERN),
+        ("local_range", r"(?<![^\W\d])(?<!\$)", _LOCAL_RANGE_PATTERN),
+        ("local_cell", r"(?<![^\W\d])(?<!\$)", _LOCAL_CELL_PATTERN),
+    ))
+)
+
 
 class Reference:
     """A single cell or range reference extracted from a formula."""
@@ -87,124 +107,152 @@ class Reference:
             self.end_col_idx = col_letter_to_index(self.end_col)
 
 
-def _in_string(formula, pos):
-    """Return True if *pos* falls inside a double-quoted string literal."""
-    in_str = False
-    i = 0
-    while i < pos:
-        if formula[i] == '"':
-            if in_str and i + 1 < len(formula) and formula[i + 1] == '"':
-                i += 2
-                continue
-            in_str = not in_str
-        i += 1
-    return in_str
-
-
-def extract_references(formula, current_sheet):
-    """Extract every cell/range reference with absolute-marker info.
+def _mask_strings(formula):
+    """Blank out the contents of string literals, preserving positions.
 
-    Returns a list of Reference objects sorted by start position.
+    Returns ``(masked, spans)``: *spans* lists the ``(start, end)`` of each
+    literal, quotes included, in order.  References are matched against
+    the masked text, so anything inside a literal (e.g. ``"A1"``) can never
+    be picked up as a reference.  Quoted sheet names (``'Q1 "draft"'!A1``)
+    are copied through untouched.  Linear in the formula length: a split
+    on ``"`` when there are no sheet names to step over, otherwise one pass
+    using ``str.find`` between quotes.
     """
+    if '"' not in formula:
+        return formula, ()
+    spans = []
+    if "'" not in formula:
+        # No sheet names to step over: literal contents sit at the odd
+        # indices of a split on '"' (an escaped "" is an empty segment)
+        parts = formula.split('"')
+        pos = len(parts[0])
+        for k in range(1, len(parts), 2):
+            end = pos + len(parts[k]) + 2
+            spans.append((pos, min(end, len(formula))))
+            pos = end + (len(parts[k + 1]) if k + 1 < len(parts) else 0)
+        parts[1::2] = [" " * len(p) for p in parts[1::2]]
+        return '"'.join(parts), spans
+    out = []
+    i, n = 0, len(formula)
+    while i < n:
+        dq = formula.find('"', i)
+        if dq < 0:
+            break
+        sq = formula.find("'", i, dq)
+        end = formula.find("'!", sq + 1) if sq >= 0 else -1
+        if end >= 0:
+            # Quoted sheet name: copy through its closing quote
+            out.append(formula[i:end + 1])
+            i = end + 1
+            continue
+        # String literal: "" is an escaped quote; unterminated runs to end
+        end = dq + 1
+        while True:
+            end = formula.find('"', end)
+            if end < 0 or not formula.startswith('"', end + 1):
+                break
+            end += 2
+        if end < 0:
+            end = n
+        out.append(formula[i:dq + 1])
+        out.append(" " * (end - dq - 1))
+        i = end
+        if i < n:
+            out.append('"')
+            i += 1
+        spans.append((dq, i))
+    out.append(formula[i:])
+    return "".join(out), spans
+
+
+def _scan_references(formula, current_sheet):
     if formula.startswith("="):
         formula = formula[1:]
 
+    masked, spans = _mask_strings(formula)
+    span_ends = [end for _, end in spans]
     refs = []
-    occupied = set()  # character positions already claimed by a match
+    pos = 0
+    while True:
+        m = _REFERENCE_PATTERN.search(masked, pos)
+        if m is None:
+            break
+        # A match running across a literal (e.g. from Sales[Amount] over
+        # ,"North's") to Summary!B2) is not a reference; retry one
+        # character on so the real refs it swallowed are still found
+        if spans:
+            k = bisect.bisect_right(span_ends, m.start())
+            if k < len(spans) and spans[k][0] < m.end():
+                pos = m.start() + 1
+                continue
+        pos = m.end()
+        shape = m.lastgroup
+        i = m.lastindex + 1
+        g = m.groups()[i - 1:]  # sub-groups of the matched shape
+        # Names are sliced from the formula, not the masked text
+        if shape.startswith("ext"):
+            ext = formula[m.start(i):m.end(i)]
+            sheet = formula[m.start(i + 1):m.end(i + 1)]
+            g = g[2:]
+        elif shape.startswith("int"):
+            if g[0] is None:
+                i += 1
+            ext, sheet, g = None, formula[m.start(i):m.end(i)], g[2:]
+        else:
+            ext, sheet = None, current_sheet
+        if shape.endswith("range"):
+            refs.append(Reference(
+                kind="range", external_file=ext, sheet=sheet,
+                col_abs=g[0] == "$", col=g[1],
+                row_abs=g[2] == "$", row=int(g[3]),
+                end_col_abs=g[4] == "$", end_col=g[5],
+                end_row_abs=g[6] == "$", end_row=int(g[7]),
+                start=m.start(), end=m.end(), raw=formula[m.start():m.end()],
+            ))
+        else:
+            refs.append(Reference(
+                kind="cell", external_file=ext, sheet=sheet,
+                col_abs=g[0] == "$", col=g[1],
+                row_abs=g[2] == "$", row=int(g[3]),
+                start=m.start(), end=m.end(), raw=formula[m.start():m.end()],
+            ))
+    return refs
 
-    def _occupied(start, end):
-        return any(p in occupied for p in range(start, end))
 
-    def _claim(start, end):
-        occupied.update(range(start, end))
+@functools.lru_cache(maxsize=1 << 16)
+def _parse_formula(formula, current_sheet):
+    """Return ``(skeleton, refs, external, cross_sheet)`` for a formula.
 
-    # --- external ranges ---
-    for m in _EXT_RANGE_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        refs.append(Reference(
-            kind="range", external_file=m.group(1), sheet=m.group(2),
-            col_abs=m.group(3) == "$", col=m.group(4),
-            row_abs=m.group(5) == "$", row=int(m.group(6)),
-            end_col_abs=m.group(7) == "$", end_col=m.group(8),
-            end_row_abs=m.group(9) == "$", end_row=int(m.group(10)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    # --- external cells ---
-    for m in _EXT_CELL_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        refs.append(Reference(
-            kind="cell", external_file=m.group(1), sheet=m.group(2),
-            col_abs=m.group(3) == "$", col=m.group(4),
-            row_abs=m.group(5) == "$", row=int(m.group(6)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    # --- internal cross-sheet ranges ---
-    for m in _INT_RANGE_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        sheet = m.group(1) or m.group(2)
-        refs.append(Reference(
-            kind="range", external_file=None, sheet=sheet,
-            col_abs=m.group(3) == "$", col=m.group(4),
-            row_abs=m.group(5) == "$", row=int(m.group(6)),
-            end_col_abs=m.group(7) == "$", end_col=m.group(8),
-            end_row_abs=m.group(9) == "$", end_row=int(m.group(10)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    # --- internal cross-sheet cells ---
-    for m in _INT_CELL_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        sheet = m.group(1) or m.group(2)
-        refs.append(Reference(
-            kind="cell", external_file=None, sheet=sheet,
-            col_abs=m.group(3) == "$", col=m.group(4),
-            row_abs=m.group(5) == "$", row=int(m.group(6)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    # --- same-sheet ranges ---
-    for m in _LOCAL_RANGE_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        # Avoid matching inside function names / table refs
-        if m.start() > 0 and (formula[m.start() - 1].isalpha() or formula[m.start() - 1] == '_'):
-            continue
-        refs.append(Reference(
-            kind="range", external_file=None, sheet=current_sheet,
-            col_abs=m.group(1) == "$", col=m.group(2),
-            row_abs=m.group(3) == "$", row=int(m.group(4)),
-            end_col_abs=m.group(5) == "$", end_col=m.group(6),
-            end_row_abs=m.group(7) == "$", end_row=int(m.group(8)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    # --- same-sheet cells ---
-    for m in _LOCAL_CELL_PATTERN.finditer(formula):
-        if _in_string(formula, m.start()) or _occupied(m.start(), m.end()):
-            continue
-        if m.start() > 0 and (formula[m.start() - 1].isalpha() or formula[m.start() - 1] == '_'):
-            continue
-        refs.append(Reference(
-            kind="cell", external_file=None, sheet=current_sheet,
-            col_abs=m.group(1) == "$", col=m.group(2),
-            row_abs=m.group(3) == "$", row=int(m.group(4)),
-            start=m.start(), end=m.end(), raw=m.group(),
-        ))
-        _claim(m.start(), m.end())
-
-    refs.sort(key=lambda r: r.start)
-    return refs
+    The result is independent of the formula's cell.  *external* holds
+    ``(file, sheet, kind)`` and *cross_sheet* ``(sheet, kind)`` tuples for
+    the references that leave *current_sheet*.
+
+    The converter visits every formula several times (grouping, external
+    discovery, reference analysis, code generation); caching the parse
+    means each distinct formula is tokenised and classified once.  The
+    returned Reference objects are shared and must not be mutated.
+    """
+    refs = tuple(_scan_references(formula, current_sheet))
+    external = tuple((r.external_file, r.sheet, r.kind)
+                     for r in refs if r.external_file)
+    cross_sheet = tuple((r.sheet, r.kind) for r in refs
+                        if not r.external_file and r.sheet != current_sheet)
+
+    # Build skeleton by replacing refs with numbered placeholders
+    skeleton = formula[1:] if formula.startswith("=") else formula
+    for idx in range(len(refs) - 1, -1, -1):
+        ref = refs[idx]
+        skeleton = skeleton[:ref.start] + f"@{idx}" + skeleton[ref.end:]
+
+    return skeleton, refs, external, cross_sheet
+
+
+def extract_references(formula, current_sheet):
+    """Extract every cell/range reference with absolute-marker info.
+
+    Returns a list of Reference objects sorted by start position.
+    """
+    return list(_parse_formula(formula, current_sheet)[1])
 
 
 # ---------------------------------------------------------------------------
@@ -222,8 +270,7 @@ def compute_pattern(formula, current_sheet, cell_col_idx, cell_row):
 
     Returns (pattern_key, refs).
     """
-    raw = formula[1:] if formula.startswith("=") else formula
-    refs = extract_references(formula, current_sheet)
+    skeleton, refs = _parse_formula(formula, current_sheet)[:2]
 
     tokens = []
     for ref in refs:
@@ -242,30 +289,29 @@ def compute_pattern(formula, current_sheet, cell_col_idx, cell_row):
             sheet_part = ref.sheet if ref.sheet != current_sheet or ext else None
             tokens.append(("range", ext, sheet_part, sc, sr, ec, er))
 
-    # Build skeleton by replacing refs with numbered placeholders
-    skeleton = raw
-    for i, ref in enumerate(reversed(refs)):
-        idx = len(refs) - 1 - i
-        skeleton = skeleton[:ref.start] + f"@{idx}" + skeleton[ref.end:]
-
-    return (skeleton, tuple(tokens)), refs
+    return (skeleton, tuple(tokens)), list(refs)
 
 
 # ---------------------------------------------------------------------------
 # Grouping
 # ---------------------------------------------------------------------------
 
-def _find_contiguous_runs(cells, is_adjacent_fn):
-    """Split a sorted list into maximal contiguous runs."""
-    if not cells:
-        return []
-    runs = [[cells[0]]]
-    for c in cells[1:]:
-        if is_adjacent_fn(runs[-1][-1], c):
-            runs[-1].append(c)
-        else:
-            runs.append([c])
-    return runs
+def _scan_runs(keyed):
+    """Yield maximal runs of consecutive positions along the same line.
+
+    *keyed* is a list of ``(line, pos, item)`` sorted by ``(line, pos)``;
+    each run is the list of its items.
+    """
+    run = []
+    prev_line = prev_pos = None
+    for line, pos, item in keyed:
+        if run and (line != prev_line or pos != prev_pos + 1):
+            yield run
+            run = []
+        run.append(item)
+        prev_line, prev_pos = line, pos
+    if run:
+        yield run
 
 
 def group_formulas(formula_cells):
@@ -274,92 +320,66 @@ def group_formulas(formula_cells):
     Returns (groups, singles) where
       * groups: list of dicts  { 'cells': [...], 'direction': 'vertical'|'horizontal' }
       * singles: list of (sheet, col, row, formula, cell_info)
+
+    Cells are sorted once per direction and scanned linearly for runs, so
+    grouping is O(n log n).  Patterns, columns and rows are numbered in
+    order of first appearance: sort keys compare as plain ints and the
+    output keeps the per-pattern order callers rely on.
     """
-    # compute patterns
-    cell_pats = []
+    # compute patterns: cells[i] = (pattern_id, col_idx, row, cell tuple)
+    pattern_ids = {}
+    cells = []
+    no_pattern = []
     for sheet, col, row, formula, cell_info in formula_cells:
         col_idx = col_letter_to_index(col)
         try:
-            pkey, refs = compute_pattern(formula, sheet, col_idx, row)
+            pkey, _refs = compute_pattern(formula, sheet, col_idx, row)
         except Exception:
-            pkey, refs = None, []
-        cell_pats.append({
-            "sheet": sheet, "col": col, "row": row,
-            "col_idx": col_idx, "formula": formula, "cell_info": cell_info,
-            "pattern_key": (sheet, pkey) if pkey else None,
-            "refs": refs,
-        })
-
-    # bucket by pattern
-    buckets = defaultdict(list)
-    no_pattern = []
-    for cp in cell_pats:
-        if cp["pattern_key"] is None:
-            no_pattern.append(cp)
+            pkey = None
+        cell = (sheet, col, row, formula, cell_info)
+        if pkey:
+            pid = pattern_ids.setdefault((sheet, pkey), len(pattern_ids))
+            cells.append((pid, col_idx, row, cell))
         else:
-            buckets[cp["pattern_key"]].append(cp)
-
-    groups = []
-    singles = []
-
-    for _pkey, cells in buckets.items():
-        if len(cells) < 2:
-            cp = cells[0]
-            singles.append((cp["sheet"], cp["col"], cp["row"],
-                            cp["formula"], cp["cell_info"]))
-            continue
-
-        used = set()
-
-        # --- vertical runs (same column, consecutive rows) ---
-        col_buckets = defaultdict(list)
-        for cp in cells:
-            col_buckets[cp["col"]].append(cp)
-
-        for _col, col_cells in col_buckets.items():
-            col_cells.sort(key=lambda c: c["row"])
-            runs = _find_contiguous_runs(
-                col_cells, lambda a, b: b["row"] - a["row"] == 1)
-            for run in runs:
-                if len(run) >= 2:
-                    groups.append({
-                        "cells": [(c["sheet"], c["col"], c["row"],
-                                   c["formula"], c["cell_info"]) for c in run],
-                        "direction": "vertical",
-                    })
-                    for c in run:
-                        used.add((c["sheet"], c["col"], c["row"]))
-
-        # --- horizontal runs (same row, consecutive columns) ---
-        remaining = [cp for cp in cells
-                     if (cp["sheet"], cp["col"], cp["row"]) not in used]
-        row_buckets = defaultdict(list)
-        for cp in remaining:
-            row_buckets[cp["row"]].append(cp)
-
-        for _row, row_cells in row_buckets.items():
-            row_cells.sort(key=lambda c: c["col_idx"])
-            runs = _find_contiguous_runs(
-                row_cells, lambda a, b: b["col_idx"] - a["col_idx"] == 1)
-            for run in runs:
-                if len(run) >= 2:
-                    groups.append({
-                        "cells": [(c["sheet"], c["col"], c["row"],
-                                   c["formula"], c["cell_info"]) for c in run],
-                        "direction": "horizontal",
-                    })
-                    for c in run:
-                        used.add((c["sheet"], c["col"], c["row"]))
-
-        # leftovers → singles
-        for cp in cells:
-            if (cp["sheet"], cp["col"], cp["row"]) not in used:
-                singles.append((cp["sheet"], cp["col"], cp["row"],
-                                cp["formula"], cp["cell_info"]))
-
-    for cp in no_pattern:
-        singles.append((cp["sheet"], cp["col"], cp["row"],
-                        cp["formula"], cp["cell_info"]))
+            no_pattern.append(cell)
+
+    tagged = []  # (pattern_id, direction rank, group)
+    used = set()
+
+    # --- vertical runs (same pattern and column, consecutive rows) ---
+    line_ids = {}
+    keyed = sorted(
+        ((line_ids.setdefault((pid, ci), len(line_ids)), r, i)
+         for i, (pid, ci, r, _c) in enumerate(cells)),
+        key=lambda k: k[:2])
+    for run in _scan_runs(keyed):
+        if len(run) >= 2:
+            tagged.append((cells[run[0]][0], 0, {
+                "cells": [cells[i][3] for i in run],
+                "direction": "vertical",
+            }))
+            used.update(run)
+
+    # --- horizontal runs (same pattern and row, consecutive columns) ---
+    line_ids = {}
+    keyed = sorted(
+        ((line_ids.setdefault((pid, r), len(line_ids)), ci, i)
+         for i, (pid, ci, r, _c) in enumerate(cells) if i not in used),
+        key=lambda k: k[:2])
+    for run in _scan_runs(keyed):
+        if len(run) >= 2:
+            tagged.append((cells[run[0]][0], 1, {
+                "cells": [cells[i][3] for i in run],
+                "direction": "horizontal",
+            }))
+            used.update(run)
+
+    # stable sorts: per pattern, vertical before horizontal, then leftovers
+    tagged.sort(key=lambda t: t[:2])
+    groups = [g for _pid, _rank, g in tagged]
+    leftovers = sorted((c for i, c in enumerate(cells) if i not in used),
+                       key=lambda c: c[0])
+    singles = [c[3] for c in leftovers] + no_pattern
 
     return groups, singles
 
@@ -450,16 +470,17 @@ def order_items(groups, singles, tables):
 # ---------------------------------------------------------------------------
 
 def discover_external_files(formula_cells):
-    """Return a dict  { filename: set of (sheet, col, row, formula) }."""
+    """Return a dict  { filename: set of (sheet, col, row, formula) }.
+
+    Uses the cached parse, so string literals are handled exactly as in
+    reference extraction and the work is shared with the later passes.
+    """
     ext_files = defaultdict(set)
     for sheet, col, row, formula, _ci in formula_cells:
-        raw = formula[1:] if formula.startswith("=") else formula
-        for m in _EXT_RANGE_PATTERN.finditer(raw):
-            if not _in_string(raw, m.start()):
-                ext_files[m.group(1)].add((sheet, col, row, formula))
-        for m in _EXT_CELL_PATTERN.finditer(raw):
-            if not _in_string(raw, m.start()):
-                ext_files[m.group(1)].add((sheet, col, row, formula))
+        if "[" not in formula:
+            continue
+        for ext_file, _, _ in _parse_formula(formula, sheet)[2]:
+            ext_files[ext_file].add((sheet, col, row, formula))
     return dict(ext_files)
 
 
@@ -477,23 +498,26 @@ def analyse_references(formula_cells):
     cross_sheet = []
     external = []
     for sheet, col, row, formula, _ci in formula_cells:
-        refs = extract_references(formula, sheet)
-        for ref in refs:
-            if ref.external_file:
-                external.append({
-                    "sheet": sheet, "col": col, "row": row,
-                    "cell": f"{col}{row}",
-                    "formula": formula,
-                    "external_file": ref.external_file,
-                    "external_sheet": ref.sheet,
-                    "ref_type": ref.kind,
-                })
-            elif ref.sheet != sheet:
-                cross_sheet.append({
-                    "sheet": sheet, "col": col, "row": row,
-                    "cell": f"{col}{row}",
-                    "formula": formula,
-                    "target_sheet": ref.sheet,
-                    "ref_type": ref.kind,
-                })
+        # Both kinds of reference carry a '!'; formulas without one (most
+        # of a typical workbook) are dropped by a substring test, unparsed
+        if "!" not in formula:
+            continue
+        _, _, ext_refs, cross_refs = _parse_formula(formula, sheet)
+        for ext_file, ext_sheet, kind in ext_refs:
+            external.append({
+                "sheet": sheet, "col": col, "row": row,
+                "cell": f"{col}{row}",
+                "formula": formula,
+                "external_file": ext_file,
+                "external_sheet": ext_sheet,
+                "ref_type": kind,
+            })
+        for target, kind in cross_refs:
+            cross_sheet.append({
+                "sheet": sheet, "col": col, "row": row,
+                "cell": f"{col}{row}",
+                "formula": formula,
+                "target_sheet": target,
+                "ref_type": kind,
+            })
     return {"cross_sheet": cross_sheet, "external": external}
@@ -11,6 +11,8 @@ Handles:
 """
 
 import re
+from itertools import product
+from string import ascii_uppercase
 
 
 # Maps Excel function names to Python helper function names
@@ -96,8 +98,21 @@ TABLE_REF_PATTERN = re.compile(
 )
 
 
+# Every column name of up to three letters, in column order: _IDX_COL[1]
+# is "A", _IDX_COL[27] is "AA".  Covers Excel's XFD limit and anything the
+# three-letter reference patterns can match.
+_IDX_COL = ("",) + tuple(
+    "".join(letters)
+    for width in (1, 2, 3)
+    for letters in product(ascii_uppercase, repeat=width))
+_COL_IDX = {col: idx for idx, col in enumerate(_IDX_COL) if col}
+
+
 def col_letter_to_index(col_str):
     """Convert column letter(s) to 1-based index. A=1, B=2, ..., Z=26, AA=27."""
+    idx = _COL_IDX.get(col_str)
+    if idx is not None:
+        return idx
     result = 0
     for char in col_str.upper():
         result = result * 26 + (ord(char) - ord('A') + 1)
@@ -106,6 +121,8 @@ def col_letter_to_index(col_str):
 
 def index_to_col_letter(index):
     """Convert 1-based column index to letter(s). 1=A, 2=B, ..., 26=Z, 27=AA."""
+    if 0 <= index < len(_IDX_COL):
+        return _IDX_COL[index]
     result = ""
     while index > 0:
         index, remainder = divmod(index - 1, 26)
@@ -3,6 +3,8 @@ Core Excel reading module with formula extraction, data region detection,
 unstructured sheet handling, and smart sampling for large files.
 """
 
+import functools
+import os
 import re
 from typing import Any
 from openpyxl import load_workbook
@@ -23,14 +25,23 @@ def open_workbook_values(path: str):
     return load_workbook(path, data_only=True)
 
 
-def sheet_names(path: str) -> list[str]:
-    """Return the list of sheet names in a workbook."""
-    wb = open_workbook(path)
-    names = wb.sheetnames
+@functools.lru_cache(maxsize=8)
+def _sheet_names_cached(path: str, mtime: float) -> tuple[str, ...]:
+    wb = load_workbook(path, read_only=True)
+    names = tuple(wb.sheetnames)
     wb.close()
     return names
 
 
+def sheet_names(path: str) -> list[str]:
+    """Return the list of sheet names in a workbook.
+
+    Names are cached per file and modification time, so repeated lookups
+    on an unchanged workbook skip reopening it.
+    """
+    return list(_sheet_names_cached(path, os.path.getmtime(path)))
+
+
 # ---------------------------------------------------------------------------
 # Data‑region detection  (handles unstructured / patchy sheets)
 # ---------------------------------------------------------------------------
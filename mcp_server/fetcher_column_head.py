@@ -28,6 +28,7 @@ import pandas as pd
 from openpyxl.utils import get_column_letter
 
 from fetcher_smart_random import (
+    Region,
     load_sheet_frames,
     detect_regions,
 )
@@ -37,7 +38,7 @@ from fetcher_smart_random import (
 # Column selection — vectorized head(n) per patch
 # ---------------------------------------------------------------------------
 
-def _allocate_col_budget(regions: list[dict], total_budget: int) -> list[int]:
+def _allocate_col_budget(regions: list[Region], total_budget: int) -> list[int]:
     """Divide *total_budget* columns across *regions* proportionally to width.
 
     Each region is guaranteed at least 2 columns (label + 1 data col)
@@ -46,7 +47,12 @@ def _allocate_col_budget(regions: list[dict], total_budget: int) -> list[int]:
     if not regions:
         return []
 
-    widths = np.array([r["max_col"] - r["min_col"] + 1 for r in regions],
+    # A lone region gets the whole budget, capped to its size
+    if len(regions) == 1:
+        reg = regions[0]
+        return [min(total_budget, max(reg.max_col - reg.min_col + 1, 0))]
+
+    widths = np.array([r.max_col - r.min_col + 1 for r in regions],
                       dtype=float)
     total_width = widths.sum()
 
@@ -83,16 +89,16 @@ def _allocate_col_budget(regions: list[dict], total_budget: int) -> list[int]:
             remaining -= 1
 
     for i, reg in enumerate(regions):
-        reg_cols = reg["max_col"] - reg["min_col"] + 1
+        reg_cols = reg.max_col - reg.min_col + 1
         budgets[i] = min(int(budgets[i]), reg_cols)
 
     return budgets.tolist()
 
 
-def column_head_indices(region: dict, budget: int) -> list[int]:
+def column_head_indices(region: Region, budget: int) -> list[int]:
     """Return 1-based column indices: first *budget* columns of the region."""
-    cmin = region["min_col"]
-    cmax = region["max_col"]
+    cmin = region.min_col
+    cmax = region.max_col
     end = min(cmin + budget, cmax + 1)
     return list(range(cmin, end))
 
@@ -145,8 +151,8 @@ def extract_sheet_data(path: str, sheet_name: str,
     was_sampled = False
 
     for reg, col_budget in zip(regions, budgets):
-        rmin, rmax = reg["min_row"], reg["max_row"]
-        cmin, cmax = reg["min_col"], reg["max_col"]
+        rmin, rmax = reg.min_row, reg.max_row
+        cmin, cmax = reg.min_col, reg.max_col
         reg_total = rmax - rmin + 1
         total_rows += reg_total
 
@@ -159,8 +165,8 @@ def extract_sheet_data(path: str, sheet_name: str,
 
         # Headers (vectorized slice)
         headers: list[str] = []
-        if reg["header_row"] is not None:
-            hdr_vals = df_f.loc[reg["header_row"], cols_to_read]
+        if reg.header_row is not None:
+            hdr_vals = df_f.loc[reg.header_row, cols_to_read]
             headers = [str(v) if pd.notna(v) else "" for v in hdr_vals]
 
         # Row data + formulas
@@ -168,7 +174,7 @@ def extract_sheet_data(path: str, sheet_name: str,
         formulas: list[dict[str, str]] = []
 
         for r in all_rows:
-            if r == reg["header_row"]:
+            if r == reg.header_row:
                 continue
             val_row = df_v.loc[r, cols_to_read] if r in df_v.index else pd.Series(
                 [None] * len(cols_to_read), index=cols_to_read)
@@ -200,7 +206,7 @@ def extract_sheet_data(path: str, sheet_name: str,
         eff_max_col = cols_to_read[-1] if cols_to_read else cmin
         result_regions.append({
             "region": (f"DataRegion(rows={rmin}-{rmax}, "
-                       f"cols={cmin}-{eff_max_col}, header={reg['header_row']})"),
+                       f"cols={cmin}-{eff_max_col}, header={reg.header_row})"),
             "min_row": rmin,
             "max_row": rmax,
             "min_col": cmin,
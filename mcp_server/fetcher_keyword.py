@@ -14,7 +14,7 @@ This is useful for an LLM to search for specific terms (e.g. "Revenue",
 "COGS") and gather the formulas in the corresponding rows and columns.
 
 The implementation uses **pandas** and **numpy** vectorized operations
-via the shared ``load_sheet_frames`` and ``detect_regions`` helpers from
+via the shared ``iter_sheet_frames`` and ``detect_regions`` helpers from
 ``fetcher_smart_random``.
 """
 
@@ -22,11 +22,11 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 
 from fetcher_smart_random import (
-    load_sheet_frames,
+    Region,
+    iter_sheet_frames,
     detect_regions,
 )
 
@@ -45,15 +45,15 @@ def _cell_matches_keyword(value: Any, keyword: str) -> bool:
 def _find_matches_in_region(
     df_f: pd.DataFrame,
     df_v: pd.DataFrame,
-    region: dict,
+    region: Region,
     keywords: list[str],
 ) -> list[dict[str, Any]]:
     """Find all cells in *region* that match any of the *keywords*.
 
     Returns a list of dicts with keys: row, col, keyword, value, formula.
     """
-    rmin, rmax = region["min_row"], region["max_row"]
-    cmin, cmax = region["min_col"], region["max_col"]
+    rmin, rmax = region.min_row, region.max_row
+    cmin, cmax = region.min_col, region.max_col
     rows = list(range(rmin, rmax + 1))
     cols = list(range(cmin, cmax + 1))
 
@@ -190,14 +190,11 @@ def search_keywords(path: str, keywords: list[str],
                 - ``columns`` — full column data for each matched column (deduplicated)
                 - ``headers`` — patch headers (if detected)
     """
-    wb = load_workbook(path, data_only=False)
-    target_sheets = [sheet_name] if sheet_name else wb.sheetnames
-    wb.close()
+    target_sheets = [sheet_name] if sheet_name else None
 
     all_matches: list[dict[str, Any]] = []
 
-    for sn in target_sheets:
-        df_v, df_f = load_sheet_frames(path, sn)
+    for sn, df_v, df_f in iter_sheet_frames(path, target_sheets):
         if df_f.empty:
             continue
 
@@ -209,8 +206,8 @@ def search_keywords(path: str, keywords: list[str],
             if not matches:
                 continue
 
-            rmin, rmax = reg["min_row"], reg["max_row"]
-            cmin, cmax = reg["min_col"], reg["max_col"]
+            rmin, rmax = reg.min_row, reg.max_row
+            cmin, cmax = reg.min_col, reg.max_col
 
             # Deduplicate matched rows and columns
             matched_row_nums = sorted(set(m["row"] for m in matches))
@@ -228,14 +225,14 @@ def search_keywords(path: str, keywords: list[str],
 
             # Extract headers
             headers: list[str] = []
-            if reg["header_row"] is not None:
+            if reg.header_row is not None:
                 hdr_cols = list(range(cmin, cmax + 1))
-                hdr_vals = df_f.loc[reg["header_row"], hdr_cols]
+                hdr_vals = df_f.loc[reg.header_row, hdr_cols]
                 headers = [str(v) if pd.notna(v) else "" for v in hdr_vals]
 
             sheet_regions.append({
                 "region": (f"DataRegion(rows={rmin}-{rmax}, "
-                           f"cols={cmin}-{cmax}, header={reg['header_row']})"),
+                           f"cols={cmin}-{cmax}, header={reg.header_row})"),
                 "min_row": rmin,
                 "max_row": rmax,
                 "min_col": cmin,
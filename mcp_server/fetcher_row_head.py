@@ -27,6 +27,7 @@ import pandas as pd
 from openpyxl.utils import get_column_letter
 
 from fetcher_smart_random import (
+    Region,
     load_sheet_frames,
     detect_regions,
     _non_null_mask,
@@ -37,7 +38,7 @@ from fetcher_smart_random import (
 # Row selection — vectorized head(n) per patch
 # ---------------------------------------------------------------------------
 
-def _allocate_budget(regions: list[dict], total_budget: int) -> list[int]:
+def _allocate_budget(regions: list[Region], total_budget: int) -> list[int]:
     """Divide *total_budget* rows across *regions* proportionally to size.
 
     Each region is guaranteed at least 2 rows (header + 1 data row) when
@@ -46,7 +47,12 @@ def _allocate_budget(regions: list[dict], total_budget: int) -> list[int]:
     if not regions:
         return []
 
-    sizes = np.array([r["max_row"] - r["min_row"] + 1 for r in regions],
+    # A lone region gets the whole budget, capped to its size
+    if len(regions) == 1:
+        reg = regions[0]
+        return [min(total_budget, max(reg.max_row - reg.min_row + 1, 0))]
+
+    sizes = np.array([r.max_row - r.min_row + 1 for r in regions],
                      dtype=float)
     total_size = sizes.sum()
 
@@ -87,17 +93,17 @@ def _allocate_budget(regions: list[dict], total_budget: int) -> list[int]:
 
     # Cap each budget to the actual region size
     for i, reg in enumerate(regions):
-        reg_rows = reg["max_row"] - reg["min_row"] + 1
+        reg_rows = reg.max_row - reg.min_row + 1
         budgets[i] = min(int(budgets[i]), reg_rows)
 
     return budgets.tolist()
 
 
-def row_head_indices(region: dict, budget: int) -> list[int]:
+def row_head_indices(region: Region, budget: int) -> list[int]:
     """Return 1-based row indices: header row + the first *budget-1* data rows."""
-    min_row = region["min_row"]
-    max_row = region["max_row"]
-    header = region["header_row"]
+    min_row = region.min_row
+    max_row = region.max_row
+    header = region.header_row
 
     selected: list[int] = []
 
@@ -162,8 +168,8 @@ def extract_sheet_data(path: str, sheet_name: str,
     was_sampled = False
 
     for reg, budget in zip(regions, budgets):
-        rmin, rmax = reg["min_row"], reg["max_row"]
-        cmin, cmax = reg["min_col"], reg["max_col"]
+        rmin, rmax = reg.min_row, reg.max_row
+        cmin, cmax = reg.min_col, reg.max_col
         reg_total = rmax - rmin + 1
         total_rows += reg_total
 
@@ -175,8 +181,8 @@ def extract_sheet_data(path: str, sheet_name: str,
         # Headers (vectorized slice)
         headers: list[str] = []
         cols = list(range(cmin, cmax + 1))
-        if reg["header_row"] is not None:
-            hdr_vals = df_f.loc[reg["header_row"], cols]
+        if reg.header_row is not None:
+            hdr_vals = df_f.loc[reg.header_row, cols]
             headers = [str(v) if pd.notna(v) else "" for v in hdr_vals]
 
         # Row data + formulas (vectorized reads)
@@ -184,7 +190,7 @@ def extract_sheet_data(path: str, sheet_name: str,
         formulas: list[dict[str, str]] = []
 
         for r in rows_to_read:
-            if r == reg["header_row"]:
+            if r == reg.header_row:
                 continue
             val_row = df_v.loc[r, cols] if r in df_v.index else pd.Series(
                 [None] * len(cols), index=cols)
@@ -215,7 +221,7 @@ def extract_sheet_data(path: str, sheet_name: str,
 
         result_regions.append({
             "region": (f"DataRegion(rows={rmin}-{rmax}, "
-                       f"cols={cmin}-{cmax}, header={reg['header_row']})"),
+                       f"cols={cmin}-{cmax}, header={reg.header_row})"),
             "min_row": rmin,
             "max_row": rmax,
             "min_col": cmin,
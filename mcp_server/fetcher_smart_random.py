@@ -30,8 +30,11 @@ The script writes a *highlighted* copy of the workbook
 colour and non-sampled cells are left unhighlighted.
 """
 
+import io
 import os
 import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
@@ -58,34 +61,45 @@ HIGHLIGHT_FILL = PatternFill(start_color="FFFF00", end_color="FFFF00",
 # DataFrame builders  (vectorized Excel → pandas)
 # ---------------------------------------------------------------------------
 
-def _load_sheet_dataframe(path: str, sheet_name: str,
-                          data_only: bool) -> pd.DataFrame:
-    """Load a worksheet into a pandas DataFrame preserving cell positions.
+@contextmanager
+def _open_workbooks(path: str):
+    """Open read-only ``(values, formulas)`` workbooks for *path*.
 
-    Row / column indices are 1-based to match openpyxl conventions.
+    Both views share a single in-memory copy of the file, so no file
+    handle stays open, and both are closed when the block exits.
     """
-    wb = load_workbook(path, data_only=data_only)
-    ws = wb[sheet_name]
-    max_row = ws.max_row or 0
-    max_col = ws.max_column or 0
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    wb_v = load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
+    wb_f = load_workbook(io.BytesIO(raw), read_only=True, data_only=False)
+    try:
+        yield wb_v, wb_f
+    finally:
+        wb_v.close()
+        wb_f.close()
+
+
+def _sheet_frames(wb_v, wb_f, sheet_name: str):
+    """Build ``(df_values, df_formulas)`` for *sheet_name* from an open pair."""
+    ws_v, ws_f = wb_v[sheet_name], wb_f[sheet_name]
+    ws_v.calculate_dimension(force=True)
+    max_row = ws_v.max_row or 0
+    max_col = ws_v.max_column or 0
 
     if max_row == 0 or max_col == 0:
-        wb.close()
-        return pd.DataFrame()
-
-    # Build a 2-D Python list, then hand it to pandas in one shot
-    data = []
-    for r in range(1, max_row + 1):
-        row_vals = []
-        for c in range(1, max_col + 1):
-            row_vals.append(ws.cell(row=r, column=c).value)
-        data.append(row_vals)
+        return pd.DataFrame(), pd.DataFrame()
 
-    wb.close()
+    bounds = dict(min_row=1, max_row=max_row, min_col=1, max_col=max_col,
+                  values_only=True)
+    data_v, data_f = [], []
+    for row_v, row_f in zip(ws_v.iter_rows(**bounds), ws_f.iter_rows(**bounds)):
+        data_v.append(row_v)
+        data_f.append(row_f)
 
     cols = list(range(1, max_col + 1))
     idx = list(range(1, max_row + 1))
-    return pd.DataFrame(data, index=idx, columns=cols)
+    return (pd.DataFrame(data_v, index=idx, columns=cols),
+            pd.DataFrame(data_f, index=idx, columns=cols))
 
 
 def load_sheet_frames(path: str, sheet_name: str):
@@ -93,10 +107,24 @@ def load_sheet_frames(path: str, sheet_name: str):
 
     *df_values*   — cached values  (``data_only=True``)
     *df_formulas* — raw cell content including formula strings
+
+    Both frames are built in one streaming pass over the sheet's rows.
+    Row / column indices are 1-based to match openpyxl conventions.
     """
-    df_v = _load_sheet_dataframe(path, sheet_name, data_only=True)
-    df_f = _load_sheet_dataframe(path, sheet_name, data_only=False)
-    return df_v, df_f
+    with _open_workbooks(path) as (wb_v, wb_f):
+        return _sheet_frames(wb_v, wb_f, sheet_name)
+
+
+def iter_sheet_frames(path: str, sheet_names: list[str] | None = None):
+    """Yield ``(sheet_name, df_values, df_formulas)`` for several sheets.
+
+    The workbook is parsed once for the whole walk instead of once per
+    sheet, and closed when the generator finishes.  *sheet_names* defaults
+    to every sheet in workbook order.
+    """
+    with _open_workbooks(path) as (wb_v, wb_f):
+        for sn in (wb_v.sheetnames if sheet_names is None else sheet_names):
+            yield (sn, *_sheet_frames(wb_v, wb_f, sn))
 
 
 # ---------------------------------------------------------------------------
@@ -109,12 +137,21 @@ def _non_null_mask(df: pd.DataFrame) -> np.ndarray:
     return pd.notna(df).values
 
 
-def detect_regions(df: pd.DataFrame):
+@dataclass(slots=True)
+class Region:
+    """Bounds of a contiguous data patch (1-based, consistent with openpyxl)."""
+
+    min_row: int
+    max_row: int
+    min_col: int
+    max_col: int
+    header_row: int | None = None
+
+
+def detect_regions(df: pd.DataFrame) -> list[Region]:
     """Detect contiguous rectangular data patches.
 
-    Returns a list of dicts, each with keys:
-        min_row, max_row, min_col, max_col, header_row
-    (all 1-based, consistent with openpyxl).
+    Returns a list of :class:`Region` bounds in sheet order.
     """
     if df.empty:
         return []
@@ -153,13 +190,7 @@ def detect_regions(df: pd.DataFrame):
 
         header_row = _detect_header_vectorized(df, min_row, max_row,
                                                min_col, max_col)
-        result.append({
-            "min_row": min_row,
-            "max_row": max_row,
-            "min_col": min_col,
-            "max_col": max_col,
-            "header_row": header_row,
-        })
+        result.append(Region(min_row, max_row, min_col, max_col, header_row))
 
     return result
 
@@ -219,7 +250,7 @@ def _formula_row_mask(df_formulas: pd.DataFrame, min_row: int, max_row: int,
 # Smart row selection  (vectorized where possible)
 # ---------------------------------------------------------------------------
 
-def sample_row_indices(region: dict, df_formulas: pd.DataFrame,
+def sample_row_indices(region: Region, df_formulas: pd.DataFrame,
                        max_rows: int = DEFAULT_SAMPLE_ROWS) -> list[int]:
     """Pick representative 1-based row indices from *region*.
 
@@ -230,8 +261,8 @@ def sample_row_indices(region: dict, df_formulas: pd.DataFrame,
       4. Last few data rows (TAIL_ROWS).
       5. Evenly-spaced middle rows to fill remaining budget.
     """
-    min_row = region["min_row"]
-    max_row = region["max_row"]
+    min_row = region.min_row
+    max_row = region.max_row
     total = max_row - min_row + 1
 
     if total <= max_rows:
@@ -240,13 +271,13 @@ def sample_row_indices(region: dict, df_formulas: pd.DataFrame,
     selected: set[int] = set()
 
     # 1. Header
-    header = region["header_row"]
+    header = region.header_row
     if header is not None:
         selected.add(header)
 
     # 2. Formula rows — vectorized detection
     fm = _formula_row_mask(df_formulas, min_row, max_row,
-                           region["min_col"], region["max_col"])
+                           region.min_col, region.max_col)
     formula_rows = np.array(range(min_row, max_row + 1))[fm]
     budget_formula = max_rows // 2
     for r in formula_rows[:budget_formula]:
@@ -302,8 +333,8 @@ def extract_sheet_data(path: str, sheet_name: str,
     was_sampled = False
 
     for reg in regions:
-        rmin, rmax = reg["min_row"], reg["max_row"]
-        cmin, cmax = reg["min_col"], reg["max_col"]
+        rmin, rmax = reg.min_row, reg.max_row
+        cmin, cmax = reg.min_col, reg.max_col
         reg_total = rmax - rmin + 1
         total_rows += reg_total
 
@@ -319,8 +350,8 @@ def extract_sheet_data(path: str, sheet_name: str,
 
         # Headers (vectorized slice)
         headers: list[str] = []
-        if reg["header_row"] is not None:
-            hdr = reg["header_row"]
+        if reg.header_row is not None:
+            hdr = reg.header_row
             cols = list(range(cmin, cmax + 1))
             hdr_vals = df_f.loc[hdr, cols]
             headers = [str(v) if pd.notna(v) else "" for v in hdr_vals]
@@ -331,7 +362,7 @@ def extract_sheet_data(path: str, sheet_name: str,
         cols = list(range(cmin, cmax + 1))
 
         for r in rows_to_read:
-            if r == reg["header_row"]:
+            if r == reg.header_row:
                 continue
             val_row = df_v.loc[r, cols] if r in df_v.index else pd.Series(
                 [None] * len(cols), index=cols)
@@ -363,7 +394,7 @@ def extract_sheet_data(path: str, sheet_name: str,
 
         result_regions.append({
             "region": (f"DataRegion(rows={rmin}-{rmax}, "
-                       f"cols={cmin}-{cmax}, header={reg['header_row']})"),
+                       f"cols={cmin}-{cmax}, header={reg.header_row})"),
             "min_row": rmin,
             "max_row": rmax,
             "min_col": cmin,
@@ -402,8 +433,8 @@ def sampled_cells(path: str, sheet_name: str,
     cells: set[tuple[int, int]] = set()
 
     for reg in regions:
-        rmin, rmax = reg["min_row"], reg["max_row"]
-        cmin, cmax = reg["min_col"], reg["max_col"]
+        rmin, rmax = reg.min_row, reg.max_row
+        cmin, cmax = reg.min_col, reg.max_col
         reg_total = rmax - rmin + 1
 
         if reg_total <= ISOLATED_MAX_ROWS:
@@ -2,9 +2,10 @@
 Output formatters — convert extracted sheet data to Markdown, JSON, or XML.
 """
 
+import io
 import json
 import xml.etree.ElementTree as ET
-from typing import Any
+from typing import Any, TextIO
 from openpyxl.utils import get_column_letter
 
 
@@ -12,53 +13,63 @@ from openpyxl.utils import get_column_letter
 # Markdown
 # ---------------------------------------------------------------------------
 
-def _md_table(headers: list[str], rows: list[dict[str, Any]]) -> str:
-    """Render a markdown table from headers and row dicts."""
+def _md_table(headers: list[str], rows: list[dict[str, Any]],
+              out: TextIO) -> None:
+    """Write a markdown table from headers and row dicts to *out*."""
     if not headers and not rows:
-        return "_empty region_\n"
+        out.write("_empty region_\n")
+        return
 
     cols = headers if headers else [
         f"Col{i+1}" for i in range(len(rows[0]["values"])) if rows
     ]
     if not cols:
-        return "_empty region_\n"
+        out.write("_empty region_\n")
+        return
 
-    lines = ["| " + " | ".join(cols) + " |"]
-    lines.append("| " + " | ".join(["---"] * len(cols)) + " |")
+    ncols = len(cols)
+    out.write("| " + " | ".join(cols) + " |\n")
+    out.write("| " + " | ".join(["---"] * ncols) + " |\n")
     for row in rows:
         vals = [str(v) if v is not None else "" for v in row["values"]]
         # Pad or trim to match header count
-        while len(vals) < len(cols):
-            vals.append("")
-        vals = vals[: len(cols)]
-        lines.append("| " + " | ".join(vals) + " |")
-    return "\n".join(lines) + "\n"
+        if len(vals) < ncols:
+            vals.extend([""] * (ncols - len(vals)))
+        out.write("| " + " | ".join(vals[:ncols]) + " |\n")
 
 
-def _md_formulas(formulas: list[dict[str, str]]) -> str:
+def _md_formulas(formulas: list[dict[str, str]], out: TextIO) -> None:
     if not formulas:
-        return ""
-    lines = ["\n**Formulas:**\n"]
+        return
+    out.write("\n**Formulas:**\n")
     for f in formulas:
         cached = f.get("cached_value", "")
-        lines.append(f"- `{f['address']}`: `{f['formula']}`  → {cached}")
-    return "\n".join(lines) + "\n"
+        out.write(f"\n- `{f['address']}`: `{f['formula']}`  → {cached}")
+    out.write("\n")
 
 
-def to_markdown(data: dict[str, Any]) -> str:
-    """Convert extracted sheet data dict to a Markdown string."""
-    parts = [f"## Sheet: {data['sheet_name']}\n"]
+def to_markdown_stream(data: dict[str, Any], out: TextIO) -> None:
+    """Write extracted sheet data as Markdown to the text stream *out*."""
+    out.write(f"## Sheet: {data['sheet_name']}\n")
     if data.get("sampled"):
-        parts.append(
-            f"_Sampled {data['sampled_rows']} of {data['total_rows']} rows._\n"
+        out.write(
+            f"\n_Sampled {data['sampled_rows']} of {data['total_rows']} rows._\n"
         )
     for i, reg in enumerate(data["regions"], 1):
-        parts.append(f"### Region {i}  (rows {reg['min_row']}–{reg['max_row']}, "
-                      f"cols {get_column_letter(reg['min_col'])}–"
-                      f"{get_column_letter(reg['max_col'])})\n")
-        parts.append(_md_table(reg["headers"], reg["rows"]))
-        parts.append(_md_formulas(reg["formulas"]))
-    return "\n".join(parts)
+        out.write(f"\n### Region {i}  (rows {reg['min_row']}–{reg['max_row']}, "
+                  f"cols {get_column_letter(reg['min_col'])}–"
+                  f"{get_column_letter(reg['max_col'])})\n")
+        out.write("\n")
+        _md_table(reg["headers"], reg["rows"], out)
+        out.write("\n")
+        _md_formulas(reg["formulas"], out)
+
+
+def to_markdown(data: dict[str, Any]) -> str:
+    """Convert extracted sheet data dict to a Markdown string."""
+    buf = io.StringIO()
+    to_markdown_stream(data, buf)
+    return buf.getvalue()
 
 
 # ---------------------------------------------------------------------------
@@ -80,8 +91,7 @@ def _add_text(parent: ET.Element, tag: str, text: str):
     el.text = str(text)
 
 
-def to_xml(data: dict[str, Any]) -> str:
-    """Convert extracted sheet data dict to an XML string."""
+def _xml_tree(data: dict[str, Any]) -> ET.ElementTree:
     root = ET.Element("sheet", name=data["sheet_name"])
     if data.get("sampled"):
         root.set("sampled", "true")
@@ -114,4 +124,16 @@ def to_xml(data: dict[str, Any]) -> str:
                 f_el.text = f["formula"]
                 f_el.set("cached_value", str(f.get("cached_value", "")))
 
-    return ET.tostring(root, encoding="unicode")
+    return ET.ElementTree(root)
+
+
+def to_xml_stream(data: dict[str, Any], out: TextIO) -> None:
+    """Write extracted sheet data as XML to the text stream *out*."""
+    _xml_tree(data).write(out, encoding="unicode")
+
+
+def to_xml(data: dict[str, Any]) -> str:
+    """Convert extracted sheet data dict to an XML string."""
+    buf = io.StringIO()
+    to_xml_stream(data, buf)
+    return buf.getvalue()
@@ -0,0 +1,14 @@
+"""Shared pytest fixtures for the test suite."""
+
+import pytest
+
+from tests.create_sample_workbook import create_sample_workbook
+
+
+@pytest.fixture(scope="session")
+def sample_wb(tmp_path_factory):
+    """Create the shared sample workbook once per test session."""
+    path = str(tmp_path_factory.mktemp("data") / "sample.xlsx")
+    create_sample_workbook(path)
+    return path
+
@@ -0,0 +1,57 @@
+"""Helpers shared by the test modules.
+
+Plain functions and constants only; pytest fixtures live in conftest.py.
+"""
+
+from contextlib import contextmanager
+
+from openpyxl import Workbook, load_workbook
+
+# Sheets written by create_sample_workbook, in workbook order.  Listed
+# statically so per-sheet tests can be parametrized at collection time.
+SAMPLE_SHEETS = ("Inputs", "Summary", "Rates")
+
+# Keys every extractor result dict, and each of its regions, must carry
+RESULT_KEYS = frozenset(
+    ("sheet_name", "regions", "sampled", "total_rows", "sampled_rows"))
+REGION_KEYS = frozenset(
+    ("headers", "rows", "formulas", "min_row", "max_row", "min_col", "max_col"))
+
+
+def result_shape_ok(data: dict):
+    """Assert that *data* has the standard extractor result dict shape."""
+    assert RESULT_KEYS <= data.keys(), RESULT_KEYS - data.keys()
+    assert isinstance(data["regions"], list)
+    for reg in data["regions"]:
+        assert REGION_KEYS <= reg.keys(), REGION_KEYS - reg.keys()
+
+
+@contextmanager
+def open_wb(path, **kw):
+    """Open a workbook and close it even if the body raises."""
+    wb = load_workbook(path, **kw)
+    try:
+        yield wb
+    finally:
+        wb.close()
+
+
+def write_cells(path, sheet_title, cells):
+    """Write ``(row, col, value)`` triples to a one-sheet workbook at *path*.
+
+    Cells are grouped by row and streamed with ``ws.append`` on a
+    write-only workbook, so openpyxl never builds an in-memory cell grid
+    or parses ``A1``-style coordinates.  Rows and columns are 1-based;
+    gaps are left empty.
+    """
+    grid = {}
+    for r, c, v in cells:
+        grid.setdefault(r, {})[c] = v
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    for r in range(1, max(grid, default=0) + 1):
+        row = grid.get(r, {})
+        ws.append([row.get(c) for c in range(1, max(row, default=0) + 1)])
+    wb.save(path)
+    wb.close()
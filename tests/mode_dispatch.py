@@ -0,0 +1,44 @@
+"""Extraction-mode dispatch for the sampler tests.
+
+Mirrors ``server._dispatch_extract`` without importing the MCP server.
+"""
+
+import os
+import sys
+
+# Make the mcp_server modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_server"))
+
+from excel_reader_smart_sampler import (
+    extract_sheet_data as smart_extract,
+    DEFAULT_SAMPLE_ROWS,
+)
+from fetcher_full import extract_sheet_data as full_extract
+from fetcher_column_n import extract_sheet_data as column_n_extract
+from fetcher_row_head import extract_sheet_data as row_head_extract
+from fetcher_column_head import extract_sheet_data as column_head_extract
+
+# mode -> extractor(path, sheet_name, kwargs)
+DISPATCH = {
+    "smart_random": lambda p, s, k: smart_extract(
+        p, s, max_sample_rows=k.get("max_sample_rows", DEFAULT_SAMPLE_ROWS)),
+    "full": lambda p, s, k: full_extract(
+        p, s, nrows=k.get("nrows"), ncols=k.get("ncols")),
+    "column_n": lambda p, s, k: column_n_extract(
+        p, s, num_columns=k.get("num_columns", 10)),
+    "row_head": lambda p, s, k: row_head_extract(
+        p, s, max_rows=k.get("max_sample_rows", DEFAULT_SAMPLE_ROWS)),
+    "column_head": lambda p, s, k: column_head_extract(
+        p, s, max_cols=k.get("max_cols", 20)),
+}
+
+
+def dispatch(mode, path, sheet_name, **kwargs):
+    """Route to the extractor for *mode*, as server._dispatch_extract does."""
+    mode = mode.lower().strip()
+    fn = DISPATCH.get(mode)
+    if fn is None:
+        raise ValueError(
+            f"Invalid mode '{mode}'. Must be one of {tuple(DISPATCH)}.")
+    return fn(path, sheet_name, kwargs)
+
@@ -11,7 +11,6 @@ import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_server"))
 sys.path.insert(0, os.path.dirname(__file__))
 
-from create_sample_workbook import create_sample_workbook
 from fetcher_keyword import search_keywords
 
 
@@ -19,14 +18,6 @@ from fetcher_keyword import search_keywords
 # Fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="module")
-def sample_wb(tmp_path_factory):
-    """Create the sample workbook once per test module."""
-    path = str(tmp_path_factory.mktemp("data") / "sample.xlsx")
-    create_sample_workbook(path)
-    return path
-
-
 @pytest.fixture(scope="module")
 def multi_patch_wb(tmp_path_factory):
     """Create a workbook with multiple data patches separated by blank rows."""
@@ -9,7 +9,7 @@ import pytest
 # Ensure the repo root is on the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from tests.create_sample_workbook import create_sample_workbook
+from tests.helpers import open_wb
 from lineage.lineage_builder import (
     build_simple_lineage,
     build_complex_lineage,
@@ -24,22 +24,13 @@ from lineage.lineage_graph import render_simple_graph, render_complex_graph
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(scope="module")
-def sample_wb_path(tmp_path_factory):
-    """Create a sample workbook once per module."""
-    d = tmp_path_factory.mktemp("lineage")
-    path = str(d / "sample.xlsx")
-    create_sample_workbook(path)
-    return path
+def simple_lineage(sample_wb):
+    return build_simple_lineage(sample_wb)
 
 
 @pytest.fixture(scope="module")
-def simple_lineage(sample_wb_path):
-    return build_simple_lineage(sample_wb_path)
-
-
-@pytest.fixture(scope="module")
-def complex_lineage(sample_wb_path):
-    return build_complex_lineage(sample_wb_path)
+def complex_lineage(sample_wb):
+    return build_complex_lineage(sample_wb)
 
 
 # ---------------------------------------------------------------------------
@@ -108,54 +99,47 @@ class TestComplexLineage:
 
 
 # ---------------------------------------------------------------------------
-# Excel output
+# Excel output and graph rendering
 # ---------------------------------------------------------------------------
 
-class TestExcelOutput:
-    def test_write_simple_lineage(self, simple_lineage, tmp_path):
-        out = str(tmp_path / "simple.xlsx")
-        write_simple_lineage(simple_lineage, out)
-        assert os.path.exists(out)
+_EXPECTED_SHEETS = {
+    "simple": ("Overview", "Inputs", "Calculations", "Outputs",
+               "Cross-Sheet Edges"),
+    "complex": ("Summary", "All Patterns", "Dependency Edges"),
+}
 
-        from openpyxl import load_workbook
-        wb = load_workbook(out)
-        assert "Overview" in wb.sheetnames
-        assert "Inputs" in wb.sheetnames
-        assert "Calculations" in wb.sheetnames
-        assert "Outputs" in wb.sheetnames
-        assert "Cross-Sheet Edges" in wb.sheetnames
-        wb.close()
-
-    def test_write_complex_lineage(self, complex_lineage, tmp_path):
-        out = str(tmp_path / "complex.xlsx")
-        write_complex_lineage(complex_lineage, out)
-        assert os.path.exists(out)
+_RENDERERS = {
+    "simple": render_simple_graph,
+    "complex": render_complex_graph,
+}
 
-        from openpyxl import load_workbook
-        wb = load_workbook(out)
-        assert "Summary" in wb.sheetnames
-        assert "All Patterns" in wb.sheetnames
-        assert "Dependency Edges" in wb.sheetnames
-        wb.close()
 
+@pytest.fixture(params=["simple", "complex"])
+def built(request, simple_lineage, complex_lineage, tmp_path):
+    """Write the simple or complex lineage workbook; yield (kind, path)."""
+    if request.param == "simple":
+        lineage, writer = simple_lineage, write_simple_lineage
+    else:
+        lineage, writer = complex_lineage, write_complex_lineage
+    out = str(tmp_path / f"{request.param}.xlsx")
+    writer(lineage, out)
+    return request.param, out
 
-# ---------------------------------------------------------------------------
-# Graph rendering
-# ---------------------------------------------------------------------------
 
-class TestGraphRendering:
-    def test_render_simple_graph(self, simple_lineage, tmp_path):
-        xlsx = str(tmp_path / "simple.xlsx")
-        write_simple_lineage(simple_lineage, xlsx)
-        png = str(tmp_path / "simple.png")
-        render_simple_graph(xlsx, png)
-        assert os.path.exists(png)
-        assert os.path.getsize(png) > 0
+class TestExcelOutput:
+    def test_write_lineage(self, built):
+        kind, out = built
+        assert os.path.exists(out)
+
+        with open_wb(out, read_only=True) as wb:
+            for name in _EXPECTED_SHEETS[kind]:
+                assert name in wb.sheetnames
 
-    def test_render_complex_graph(self, complex_lineage, tmp_path):
-        xlsx = str(tmp_path / "complex.xlsx")
-        write_complex_lineage(complex_lineage, xlsx)
-        png = str(tmp_path / "complex.png")
-        render_complex_graph(xlsx, png)
+
+class TestGraphRendering:
+    def test_render_graph(self, built, tmp_path):
+        kind, xlsx = built
+        png = str(tmp_path / f"{kind}.png")
+        _RENDERERS[kind](xlsx, png)
         assert os.path.exists(png)
         assert os.path.getsize(png) > 0
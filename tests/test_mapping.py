@@ -1,16 +1,19 @@
 """Tests for the excel_to_mapping module (tabular format)."""
 
+import functools
 import os
 import shutil
 import sys
 import tempfile
 import unittest
+from string import ascii_uppercase
 
-from openpyxl import Workbook, load_workbook
+import pytest
+from openpyxl import Workbook
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from tests.create_sample_workbook import create_sample_workbook
+from tests.helpers import open_wb, write_cells
 from excel_to_mapping.mapper import (
     generate_mapping_report,
     _build_all_referenced_cells,
@@ -25,101 +28,144 @@ from excel_to_python import parse_workbook, classify_cells
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Column letters by 0-based position: _COLS[1] is "B"
+_COLS = tuple(ascii_uppercase)
+
+
 def _create_simple_workbook(path):
     """Workbook with inputs, intermediate calcs, and final outputs."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Data"
-    ws["A1"] = "Price"
-    ws["A2"] = 10
-    ws["B1"] = "Qty"
-    ws["B2"] = 5
-    ws["C1"] = "Subtotal"
-    ws["C2"] = "=A2*B2"       # intermediate calc (referenced by D2)
-    ws["D1"] = "Total"
-    ws["D2"] = "=C2+100"      # output (not referenced by anything)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Data")
+    ws.append(["Price", "Qty", "Subtotal", "Total"])
+    # C2 is an intermediate calc (referenced by D2); D2 is an output
+    ws.append([10, 5, "=A2*B2", "=C2+100"])
     wb.save(path)
     wb.close()
 
 
 def _create_vertical_drag_workbook(path):
     """Workbook with a dragged formula column and a SUM output."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Sales"
-    ws["A1"] = "Revenue"
-    ws["B1"] = "Cost"
-    ws["C1"] = "Profit"
+    cells = [(1, 1, "Revenue"), (1, 2, "Cost"), (1, 3, "Profit")]
     for r in range(2, 7):
-        ws[f"A{r}"] = 1000 * r
-        ws[f"B{r}"] = 600 * r
-        ws[f"C{r}"] = f"=A{r}-B{r}"   # dragged formula (intermediate)
-    ws["C7"] = "=SUM(C2:C6)"          # output
-    wb.save(path)
-    wb.close()
+        cells += [
+            (r, 1, 1000 * r),
+            (r, 2, 600 * r),
+            (r, 3, f"=A{r}-B{r}"),    # dragged formula (intermediate)
+        ]
+    cells.append((7, 3, "=SUM(C2:C6)"))  # output
+    write_cells(path, "Sales", cells)
 
 
 def _create_multi_sheet_workbook(path):
     """Workbook with two sheets and cross-sheet references."""
-    wb = Workbook()
-    ws1 = wb.active
-    ws1.title = "Input"
-    ws1["A1"] = "Val"
-    ws1["A2"] = 42
-
-    ws2 = wb.create_sheet("Calc")
-    ws2["A1"] = "Doubled"
-    ws2["A2"] = "=Input!A2*2"      # calc (referenced by B2)
-    ws2["B1"] = "Final"
-    ws2["B2"] = "=A2+10"           # output
+    wb = Workbook(write_only=True)
+    ws1 = wb.create_sheet(title="Input")
+    ws1.append(["Val"])
+    ws1.append([42])
+
+    ws2 = wb.create_sheet(title="Calc")
+    ws2.append(["Doubled", "Final"])
+    # A2 is a calc (referenced by B2); B2 is an output
+    ws2.append(["=Input!A2*2", "=A2+10"])
     wb.save(path)
     wb.close()
 
 
 def _create_horizontal_drag_workbook(path):
     """Workbook with horizontally-dragged formulas."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Forecast"
+    cells = [(1, 1, "Base"), (2, 1, "Grown")]
     for ci in range(5):
-        col = chr(66 + ci)  # B..F
-        ws[f"{col}1"] = 100 + ci * 10
-        ws[f"{col}2"] = f"={col}1*1.1"  # dragged horizontally
-    ws["A1"] = "Base"
-    ws["A2"] = "Grown"
-    wb.save(path)
-    wb.close()
+        col = _COLS[1 + ci]  # B..F
+        cells += [
+            (1, ci + 2, 100 + ci * 10),
+            (2, ci + 2, f"={col}1*1.1"),  # dragged horizontally
+        ]
+    write_cells(path, "Forecast", cells)
 
 
 def _create_all_formulas_workbook(path):
     """Workbook where every cell is a formula (no hardcoded inputs)."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Formulas"
-    ws["A1"] = "=1+1"
-    ws["A2"] = "=A1*2"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Formulas")
+    ws.append(["=1+1"])
+    ws.append(["=A1*2"])
     wb.save(path)
     wb.close()
 
 
 def _create_no_formulas_workbook(path):
     """Workbook with no formulas at all."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Static"
-    ws["A1"] = "Hello"
-    ws["B1"] = 42
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Static")
+    ws.append(["Hello", 42])
     wb.save(path)
     wb.close()
 
 
-def _read_report_rows(ws):
-    """Read all data rows from a tabular report sheet as list of dicts."""
-    ncols = len(COLUMNS) + 1
-    headers = [ws.cell(row=1, column=c).value for c in range(1, ncols)]
+# Source workbooks are read-only fixtures: build each one once per module
+# and hand every test class -- unittest or pytest -- the same path.
+_MODULE_TMPDIR = None
+_WORKBOOKS = {}
+
+
+def setUpModule():
+    # Runs before any class setup and any module-scoped pytest fixture, so
+    # every temp file of this module lands in the dir removed below
+    global _MODULE_TMPDIR
+    _MODULE_TMPDIR = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    global _MODULE_TMPDIR
+    shutil.rmtree(_MODULE_TMPDIR)
+    _MODULE_TMPDIR = None
+    _WORKBOOKS.clear()
+
+
+def _shared_workbook(creator):
+    """Return the path of *creator*'s workbook, building it on first use."""
+    path = _WORKBOOKS.get(creator)
+    if path is None:
+        path = os.path.join(_MODULE_TMPDIR, f"{creator.__name__}.xlsx")
+        creator(path)
+        _WORKBOOKS[creator] = path
+    return path
+
+
+@functools.lru_cache(maxsize=32)
+def _classified(path):
+    """Parse and classify the workbook at *path* once per test session.
+
+    Returns ``(sheets, tables, formula_cells, hardcoded_cells)`` for the
+    ``classified`` argument of :func:`generate_mapping_report`.  Fixture
+    paths identify immutable files, so caching by path is safe.
+    """
+    with open_wb(path) as wb:
+        sheets, tables = parse_workbook(wb)
+    formula_cells, hardcoded_cells = classify_cells(sheets, tables)
+    return sheets, tables, formula_cells, hardcoded_cells
+
+
+def _read_report_column(path, sheet, col, max_row=None):
+    """Return the values of 1-based column *col* of *sheet* in *path*.
+
+    The workbook is opened read-only with cached values only, so no
+    styles or Cell objects are built for the rest of the sheet.
+    """
+    with open_wb(path, read_only=True, data_only=True) as wb:
+        return [v for (v,) in wb[sheet].iter_rows(
+            max_row=max_row, min_col=col, max_col=col, values_only=True)]
+
+
+def _read_report_rows(ws, headers=COLUMNS):
+    """Read all data rows from a tabular report sheet as list of dicts.
+
+    The header row is not re-read: ``test_report_has_tabular_header``
+    already checks that it matches ``COLUMNS``.
+    """
     rows = []
-    for r in range(2, ws.max_row + 1):
-        vals = [ws.cell(row=r, column=c).value for c in range(1, ncols)]
+    for vals in ws.iter_rows(min_row=2, max_col=len(headers),
+                             values_only=True):
         if all(v is None for v in vals):
             continue
         rows.append(dict(zip(headers, vals)))
@@ -130,52 +176,51 @@ def _read_report_rows(ws):
 # Unit tests: classification helpers
 # ---------------------------------------------------------------------------
 
+# Formula-cell fixtures shared across tests (the helpers accept any iterable).
+_REF_SIMPLE = (
+    ("Sheet1", "C", 2, "=A2*B2", {}),
+    ("Sheet1", "D", 2, "=C2+100", {}),
+)
+_REF_RANGE = (("Sheet1", "C", 7, "=SUM(C2:C6)", {}),)
+_REF_CROSS_SHEET = (("Calc", "A", 2, "=Input!A2*2", {}),)
+_CLASSIFY_CHAIN = (
+    ("S", "C", 2, "=A2*B2", {}),   # referenced by D2 → calculation
+    ("S", "D", 2, "=C2+100", {}),   # not referenced → output
+)
+_CLASSIFY_INDEPENDENT = (
+    ("S", "C", 2, "=A2*B2", {}),
+    ("S", "D", 2, "=A2+B2", {}),
+)
+
+
 class TestBuildAllReferencedCells(unittest.TestCase):
     def test_simple_references(self):
-        formulas = [
-            ("Sheet1", "C", 2, "=A2*B2", {}),
-            ("Sheet1", "D", 2, "=C2+100", {}),
-        ]
-        refs = _build_all_referenced_cells(formulas)
+        refs = _build_all_referenced_cells(_REF_SIMPLE)
         self.assertIn(("Sheet1", "A", 2), refs)
         self.assertIn(("Sheet1", "B", 2), refs)
         self.assertIn(("Sheet1", "C", 2), refs)
         self.assertNotIn(("Sheet1", "D", 2), refs)
 
     def test_range_references_expanded(self):
-        formulas = [
-            ("Sheet1", "C", 7, "=SUM(C2:C6)", {}),
-        ]
-        refs = _build_all_referenced_cells(formulas)
+        refs = _build_all_referenced_cells(_REF_RANGE)
         for r in range(2, 7):
             self.assertIn(("Sheet1", "C", r), refs)
 
     def test_cross_sheet_reference(self):
-        formulas = [
-            ("Calc", "A", 2, "=Input!A2*2", {}),
-        ]
-        refs = _build_all_referenced_cells(formulas)
+        refs = _build_all_referenced_cells(_REF_CROSS_SHEET)
         self.assertIn(("Input", "A", 2), refs)
 
 
 class TestClassifyFormulaCells(unittest.TestCase):
     def test_intermediate_vs_output(self):
-        formulas = [
-            ("S", "C", 2, "=A2*B2", {}),   # referenced by D2 → calculation
-            ("S", "D", 2, "=C2+100", {}),   # not referenced → output
-        ]
-        calcs, outputs = _classify_formula_cells(formulas)
+        calcs, outputs = _classify_formula_cells(_CLASSIFY_CHAIN)
         calc_keys = {(s, c, r) for s, c, r, *_ in calcs}
         out_keys = {(s, c, r) for s, c, r, *_ in outputs}
         self.assertIn(("S", "C", 2), calc_keys)
         self.assertIn(("S", "D", 2), out_keys)
 
     def test_all_outputs_when_no_inter_deps(self):
-        formulas = [
-            ("S", "C", 2, "=A2*B2", {}),
-            ("S", "D", 2, "=A2+B2", {}),
-        ]
-        calcs, outputs = _classify_formula_cells(formulas)
+        calcs, outputs = _classify_formula_cells(_CLASSIFY_INDEPENDENT)
         self.assertEqual(len(calcs), 0)
         self.assertEqual(len(outputs), 2)
 
@@ -211,19 +256,9 @@ class TestBuildSheetRows(unittest.TestCase):
 class TestBuildSheetRowsIntegration(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.path = os.path.join(cls.tmpdir, "simple.xlsx")
-        _create_simple_workbook(cls.path)
-
-        wb = load_workbook(cls.path)
-        cls.sheets, cls.tables = parse_workbook(wb)
-        cls.formula_cells, cls.hardcoded_cells = classify_cells(
-            cls.sheets, cls.tables)
-        wb.close()
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        cls.path = _shared_workbook(_create_simple_workbook)
+        (cls.sheets, cls.tables,
+         cls.formula_cells, cls.hardcoded_cells) = _classified(cls.path)
 
     def test_inputs_present(self):
         rows = _build_sheet_rows(
@@ -233,6 +268,13 @@ class TestBuildSheetRowsIntegration(unittest.TestCase):
         self.assertIn(10, values)
         self.assertIn(5, values)
 
+    def test_all_types_present(self):
+        """Row types come from _build_sheet_rows; no report round-trip."""
+        rows = _build_sheet_rows(
+            "Data", self.hardcoded_cells, self.formula_cells)
+        types = {r["Type"] for r in rows}
+        self.assertEqual(types, {"Input", "Calculation", "Output"})
+
     def test_calculations_and_outputs_split(self):
         rows = _build_sheet_rows(
             "Data", self.hardcoded_cells, self.formula_cells)
@@ -246,266 +288,211 @@ class TestBuildSheetRowsIntegration(unittest.TestCase):
 # End-to-end: report generation
 # ---------------------------------------------------------------------------
 
-class TestGenerateMappingReportSimple(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "simple.xlsx")
-        _create_simple_workbook(cls.wb_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_report_created(self):
-        rpt = os.path.join(self.tmpdir, "report.xlsx")
-        result = generate_mapping_report(self.wb_path, output_path=rpt)
-        self.assertTrue(os.path.exists(result))
-
-    def test_report_has_sheet(self):
-        rpt = os.path.join(self.tmpdir, "report2.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertIn("Data", wb.sheetnames)
-        wb.close()
-
-    def test_report_has_tabular_header(self):
-        rpt = os.path.join(self.tmpdir, "report3.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Data"]
-        headers = [ws.cell(row=1, column=c).value
-                   for c in range(1, len(COLUMNS) + 1)]
-        self.assertEqual(headers, COLUMNS)
-        wb.close()
-
-    def test_report_contains_all_types(self):
-        rpt = os.path.join(self.tmpdir, "report4.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Data"]
-        data = _read_report_rows(ws)
-        types = {r["Type"] for r in data}
-        self.assertIn("Input", types)
-        self.assertIn("Calculation", types)
-        self.assertIn("Output", types)
-        wb.close()
-
-    def test_report_has_metadata_sheet(self):
-        rpt = os.path.join(self.tmpdir, "report5.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertIn("_Metadata", wb.sheetnames)
-        ws = wb["_Metadata"]
-        self.assertEqual(ws.cell(row=1, column=1).value, "SheetName")
-        self.assertEqual(ws.cell(row=2, column=1).value, "Data")
-        wb.close()
-
-
-class TestGenerateMappingReportVerticalDrag(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "vertical.xlsx")
-        _create_vertical_drag_workbook(cls.wb_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_dragged_formulas_collapsed(self):
-        rpt = os.path.join(self.tmpdir, "report.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Sales"]
-        data = _read_report_rows(ws)
+def _workbook_fixture(creator):
+    """Module-scoped fixture yielding the shared path of *creator*'s workbook."""
+    @pytest.fixture(scope="module")
+    def _fixture():
+        return _shared_workbook(creator)
+    return _fixture
+
+
+simple_wb = _workbook_fixture(_create_simple_workbook)
+vertical_wb = _workbook_fixture(_create_vertical_drag_workbook)
+multi_sheet_wb = _workbook_fixture(_create_multi_sheet_workbook)
+horizontal_wb = _workbook_fixture(_create_horizontal_drag_workbook)
+all_formulas_wb = _workbook_fixture(_create_all_formulas_workbook)
+no_formulas_wb = _workbook_fixture(_create_no_formulas_workbook)
+
+
+class TestGenerateMappingReportSimple:
+    def test_report_created(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        result = generate_mapping_report(simple_wb, output_path=rpt,
+                                         classified=_classified(simple_wb))
+        assert os.path.exists(result)
+
+    def test_dry_run_skips_serialisation(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        result = generate_mapping_report(simple_wb, output_path=rpt,
+                                         dry_run=True,
+                                         classified=_classified(simple_wb))
+        assert result == rpt
+        assert not os.path.exists(result)
+
+    def test_dry_run_keeps_existing_report(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, output_path=rpt,
+                                classified=_classified(simple_wb))
+        with open(rpt, "rb") as fh:
+            before = fh.read()
+        generate_mapping_report(simple_wb, output_path=rpt, dry_run=True,
+                                classified=_classified(simple_wb))
+        with open(rpt, "rb") as fh:
+            assert fh.read() == before
+
+    def test_report_has_sheet(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, output_path=rpt,
+                                classified=_classified(simple_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            assert "Data" in wb.sheetnames
+
+    def test_report_has_tabular_header(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, output_path=rpt,
+                                classified=_classified(simple_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            ws = wb["Data"]
+            headers = next(ws.iter_rows(max_row=1, max_col=len(COLUMNS),
+                                        values_only=True))
+            assert list(headers) == COLUMNS
+
+    def test_report_has_metadata_sheet(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, output_path=rpt,
+                                classified=_classified(simple_wb))
+        assert _read_report_column(rpt, "_Metadata", 1, max_row=2) == [
+            "SheetName", "Data"]
+
+
+class TestGenerateMappingReportVerticalDrag:
+    def test_dragged_formulas_collapsed(self, vertical_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(vertical_wb, output_path=rpt,
+                                classified=_classified(vertical_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Sales"])
         grouped = [r for r in data if r.get("GroupSize") is not None]
-        self.assertEqual(len(grouped), 1)
-        self.assertEqual(grouped[0]["GroupSize"], 5)
-        self.assertEqual(grouped[0]["GroupDirection"], "vertical")
-        wb.close()
-
-    def test_sum_is_output(self):
-        rpt = os.path.join(self.tmpdir, "report_out.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Sales"]
-        data = _read_report_rows(ws)
+        assert len(grouped) == 1
+        assert grouped[0]["GroupSize"] == 5
+        assert grouped[0]["GroupDirection"] == "vertical"
+
+    def test_sum_is_output(self, vertical_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(vertical_wb, output_path=rpt,
+                                classified=_classified(vertical_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Sales"])
         output_rows = [r for r in data if r["Type"] == "Output"]
         formulas = [r["Formula"] for r in output_rows if r["Formula"]]
-        self.assertTrue(
-            any("SUM" in f for f in formulas),
-            "SUM formula should appear as an Output row",
-        )
-        wb.close()
-
-
-class TestGenerateMappingReportMultiSheet(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "multi.xlsx")
-        _create_multi_sheet_workbook(cls.wb_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_all_sheets_in_report(self):
-        rpt = os.path.join(self.tmpdir, "report.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertIn("Input", wb.sheetnames)
-        self.assertIn("Calc", wb.sheetnames)
-        self.assertIn("_Metadata", wb.sheetnames)
-        wb.close()
-
-    def test_subset_sheets(self):
-        rpt = os.path.join(self.tmpdir, "report_sub.xlsx")
-        generate_mapping_report(self.wb_path, sheet_names=["Calc"],
-                                output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertIn("Calc", wb.sheetnames)
-        self.assertNotIn("Input", wb.sheetnames)
-        wb.close()
-
-    def test_cross_sheet_calc_vs_output(self):
-        rpt = os.path.join(self.tmpdir, "report_cs.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Calc"]
-        data = _read_report_rows(ws)
+        assert any("SUM" in f for f in formulas), \
+            "SUM formula should appear as an Output row"
+
+
+class TestGenerateMappingReportMultiSheet:
+    def test_all_sheets_in_report(self, multi_sheet_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(multi_sheet_wb, output_path=rpt,
+                                classified=_classified(multi_sheet_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            assert "Input" in wb.sheetnames
+            assert "Calc" in wb.sheetnames
+            assert "_Metadata" in wb.sheetnames
+
+    def test_subset_sheets(self, multi_sheet_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(multi_sheet_wb, sheet_names=["Calc"],
+                                output_path=rpt,
+                                classified=_classified(multi_sheet_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            assert "Calc" in wb.sheetnames
+            assert "Input" not in wb.sheetnames
+
+    def test_cross_sheet_calc_vs_output(self, multi_sheet_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(multi_sheet_wb, output_path=rpt,
+                                classified=_classified(multi_sheet_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Calc"])
         calc_cells = [r["Cell"] for r in data if r["Type"] == "Calculation"]
         out_cells = [r["Cell"] for r in data if r["Type"] == "Output"]
-        self.assertIn("A2", calc_cells)
-        self.assertIn("B2", out_cells)
-        wb.close()
-
+        assert "A2" in calc_cells
+        assert "B2" in out_cells
 
-class TestGenerateMappingReportHorizontalDrag(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "horiz.xlsx")
-        _create_horizontal_drag_workbook(cls.wb_path)
 
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_horizontal_group_detected(self):
-        rpt = os.path.join(self.tmpdir, "report.xlsx")
-        generate_mapping_report(self.wb_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Forecast"]
-        data = _read_report_rows(ws)
+class TestGenerateMappingReportHorizontalDrag:
+    def test_horizontal_group_detected(self, horizontal_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(horizontal_wb, output_path=rpt,
+                                classified=_classified(horizontal_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Forecast"])
         grouped = [r for r in data if r.get("GroupSize") is not None]
-        self.assertEqual(len(grouped), 1)
-        self.assertEqual(grouped[0]["GroupSize"], 5)
-        self.assertEqual(grouped[0]["GroupDirection"], "horizontal")
-        wb.close()
-
-
-class TestGenerateMappingReportEdgeCases(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_no_formulas(self):
-        path = os.path.join(self.tmpdir, "nof.xlsx")
-        _create_no_formulas_workbook(path)
-        rpt = os.path.join(self.tmpdir, "rpt_nof.xlsx")
-        generate_mapping_report(path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Static"]
-        data = _read_report_rows(ws)
+        assert len(grouped) == 1
+        assert grouped[0]["GroupSize"] == 5
+        assert grouped[0]["GroupDirection"] == "horizontal"
+
+
+class TestGenerateMappingReportEdgeCases:
+    def test_no_formulas(self, no_formulas_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(no_formulas_wb, output_path=rpt,
+                                classified=_classified(no_formulas_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Static"])
         types = {r["Type"] for r in data}
         # Only inputs, no calculations or outputs
-        self.assertEqual(types, {"Input"})
-        wb.close()
-
-    def test_all_formulas(self):
-        path = os.path.join(self.tmpdir, "allf.xlsx")
-        _create_all_formulas_workbook(path)
-        rpt = os.path.join(self.tmpdir, "rpt_allf.xlsx")
-        generate_mapping_report(path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Formulas"]
-        data = _read_report_rows(ws)
+        assert types == {"Input"}
+
+    def test_all_formulas(self, all_formulas_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(all_formulas_wb, output_path=rpt,
+                                classified=_classified(all_formulas_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Formulas"])
         types = {r["Type"] for r in data}
         # No inputs; only Calculation and/or Output
-        self.assertNotIn("Input", types)
-        self.assertTrue(len(data) > 0)
-        wb.close()
-
-    def test_nonexistent_sheet_ignored(self):
-        path = os.path.join(self.tmpdir, "simple2.xlsx")
-        _create_simple_workbook(path)
-        rpt = os.path.join(self.tmpdir, "rpt_ne.xlsx")
-        generate_mapping_report(path, sheet_names=["NoSuchSheet"],
-                                output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertNotIn("NoSuchSheet", wb.sheetnames)
-        self.assertTrue(len(wb.sheetnames) >= 1)
-        wb.close()
-
-    def test_include_flag_defaults_true(self):
-        path = os.path.join(self.tmpdir, "simple_inc.xlsx")
-        _create_simple_workbook(path)
-        rpt = os.path.join(self.tmpdir, "rpt_inc.xlsx")
-        generate_mapping_report(path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Data"]
-        data = _read_report_rows(ws)
+        assert "Input" not in types
+        assert len(data) > 0
+
+    def test_nonexistent_sheet_ignored(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, sheet_names=["NoSuchSheet"],
+                                output_path=rpt,
+                                classified=_classified(simple_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            assert "NoSuchSheet" not in wb.sheetnames
+            assert len(wb.sheetnames) >= 1
+
+    def test_include_flag_defaults_true(self, simple_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(simple_wb, output_path=rpt,
+                                classified=_classified(simple_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Data"])
         for row in data:
-            self.assertTrue(row["IncludeFlag"])
-        wb.close()
+            assert row["IncludeFlag"]
 
 
-class TestGenerateMappingReportSampleWorkbook(unittest.TestCase):
+class TestGenerateMappingReportSampleWorkbook:
     """End-to-end with the shared sample workbook used by vectorized tests."""
 
-    @classmethod
-    def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.sample_path = os.path.join(cls.tmpdir, "sample.xlsx")
-        create_sample_workbook(cls.sample_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
-
-    def test_all_sheets_present(self):
-        rpt = os.path.join(self.tmpdir, "rpt_sample.xlsx")
-        generate_mapping_report(self.sample_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        self.assertIn("Inputs", wb.sheetnames)
-        self.assertIn("Summary", wb.sheetnames)
-        self.assertIn("Rates", wb.sheetnames)
-        self.assertIn("_Metadata", wb.sheetnames)
-        wb.close()
-
-    def test_inputs_sheet_has_inputs(self):
-        rpt = os.path.join(self.tmpdir, "rpt_sample2.xlsx")
-        generate_mapping_report(self.sample_path, output_path=rpt)
-        wb = load_workbook(rpt)
-        ws = wb["Inputs"]
-        data = _read_report_rows(ws)
+    def test_all_sheets_present(self, sample_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(sample_wb, output_path=rpt,
+                                classified=_classified(sample_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            assert "Inputs" in wb.sheetnames
+            assert "Summary" in wb.sheetnames
+            assert "Rates" in wb.sheetnames
+            assert "_Metadata" in wb.sheetnames
+
+    def test_inputs_sheet_has_inputs(self, sample_wb, tmp_path):
+        rpt = str(tmp_path / "report.xlsx")
+        generate_mapping_report(sample_wb, output_path=rpt,
+                                classified=_classified(sample_wb))
+        with open_wb(rpt, read_only=True, data_only=True) as wb:
+            data = _read_report_rows(wb["Inputs"])
         input_rows = [r for r in data if r["Type"] == "Input"]
         values = [r["Value"] for r in input_rows]
-        self.assertTrue(any(isinstance(v, (int, float)) for v in values))
-        wb.close()
+        assert any(isinstance(v, (int, float)) for v in values)
 
-    def test_default_output_path(self):
+    def test_default_output_path(self, sample_wb):
         """When no output_path given, report goes to ./output/."""
-        rpt = generate_mapping_report(self.sample_path)
-        self.assertTrue(os.path.exists(rpt))
-        self.assertIn("mapping_report.xlsx", rpt)
-        os.remove(rpt)
+        rpt = generate_mapping_report(sample_wb, dry_run=True,
+                                      classified=_classified(sample_wb))
+        assert rpt == os.path.join(os.path.dirname(sample_wb), "output",
+                                   "mapping_report.xlsx")
 
 
 # ---------------------------------------------------------------------------
@@ -569,15 +556,11 @@ class TestExpandGroup(unittest.TestCase):
 class TestRegenerateSimple(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "simple.xlsx")
-        _create_simple_workbook(cls.wb_path)
+        cls.wb_path = _shared_workbook(_create_simple_workbook)
+        cls.tmpdir = tempfile.mkdtemp(dir=_MODULE_TMPDIR)
         cls.rpt_path = os.path.join(cls.tmpdir, "report.xlsx")
-        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path,
+                                classified=_classified(cls.wb_path))
 
     def test_regenerate_creates_file(self):
         out = os.path.join(self.tmpdir, "regen.xlsx")
@@ -587,86 +570,70 @@ class TestRegenerateSimple(unittest.TestCase):
     def test_regenerate_values_match(self):
         out = os.path.join(self.tmpdir, "regen2.xlsx")
         regenerate_workbook(self.rpt_path, out)
-        wb_o = load_workbook(self.wb_path)
-        wb_r = load_workbook(out)
-        ws_o = wb_o["Data"]
-        ws_r = wb_r["Data"]
-        for row in ws_o.iter_rows():
-            for cell in row:
-                if cell.value is not None:
-                    r_val = ws_r[f"{cell.column_letter}{cell.row}"].value
-                    self.assertEqual(cell.value, r_val,
-                                     f"Mismatch at {cell.column_letter}{cell.row}")
-        wb_o.close()
-        wb_r.close()
+        with open_wb(self.wb_path, read_only=True) as wb_o, \
+                open_wb(out, read_only=True) as wb_r:
+            ws_o = wb_o["Data"]
+            ws_r = wb_r["Data"]
+            for row in ws_o.iter_rows():
+                for cell in row:
+                    if cell.value is not None:
+                        r_val = ws_r[f"{cell.column_letter}{cell.row}"].value
+                        self.assertEqual(
+                            cell.value, r_val,
+                            f"Mismatch at {cell.column_letter}{cell.row}")
 
 
 class TestRegenerateVerticalDrag(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "vert.xlsx")
-        _create_vertical_drag_workbook(cls.wb_path)
+        cls.wb_path = _shared_workbook(_create_vertical_drag_workbook)
+        cls.tmpdir = tempfile.mkdtemp(dir=_MODULE_TMPDIR)
         cls.rpt_path = os.path.join(cls.tmpdir, "report.xlsx")
-        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path,
+                                classified=_classified(cls.wb_path))
 
     def test_formulas_expanded(self):
         out = os.path.join(self.tmpdir, "regen.xlsx")
         regenerate_workbook(self.rpt_path, out)
-        wb = load_workbook(out)
-        ws = wb["Sales"]
-        for r in range(2, 7):
-            self.assertEqual(ws[f"C{r}"].value, f"=A{r}-B{r}")
-        self.assertEqual(ws["C7"].value, "=SUM(C2:C6)")
-        wb.close()
+        with open_wb(out, read_only=True) as wb:
+            ws = wb["Sales"]
+            for r in range(2, 7):
+                self.assertEqual(ws[f"C{r}"].value, f"=A{r}-B{r}")
+            self.assertEqual(ws["C7"].value, "=SUM(C2:C6)")
 
 
 class TestRegenerateMultiSheet(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "multi.xlsx")
-        _create_multi_sheet_workbook(cls.wb_path)
+        cls.wb_path = _shared_workbook(_create_multi_sheet_workbook)
+        cls.tmpdir = tempfile.mkdtemp(dir=_MODULE_TMPDIR)
         cls.rpt_path = os.path.join(cls.tmpdir, "report.xlsx")
-        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path,
+                                classified=_classified(cls.wb_path))
 
     def test_all_sheets_regenerated(self):
         out = os.path.join(self.tmpdir, "regen.xlsx")
         regenerate_workbook(self.rpt_path, out)
-        wb = load_workbook(out)
-        self.assertIn("Input", wb.sheetnames)
-        self.assertIn("Calc", wb.sheetnames)
-        wb.close()
+        with open_wb(out, read_only=True) as wb:
+            self.assertIn("Input", wb.sheetnames)
+            self.assertIn("Calc", wb.sheetnames)
 
     def test_cross_sheet_formula_intact(self):
         out = os.path.join(self.tmpdir, "regen_cs.xlsx")
         regenerate_workbook(self.rpt_path, out)
-        wb = load_workbook(out)
-        ws = wb["Calc"]
-        self.assertEqual(ws["A2"].value, "=Input!A2*2")
-        wb.close()
+        with open_wb(out, read_only=True) as wb:
+            ws = wb["Calc"]
+            self.assertEqual(ws["A2"].value, "=Input!A2*2")
 
 
 class TestInputTemplate(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "simple.xlsx")
-        _create_simple_workbook(cls.wb_path)
+        cls.wb_path = _shared_workbook(_create_simple_workbook)
+        cls.tmpdir = tempfile.mkdtemp(dir=_MODULE_TMPDIR)
         cls.rpt_path = os.path.join(cls.tmpdir, "report.xlsx")
-        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path,
+                                classified=_classified(cls.wb_path))
 
     def test_template_created(self):
         out = os.path.join(self.tmpdir, "template.xlsx")
@@ -676,87 +643,66 @@ class TestInputTemplate(unittest.TestCase):
     def test_template_has_inputs(self):
         out = os.path.join(self.tmpdir, "template2.xlsx")
         generate_input_template(self.rpt_path, out)
-        wb = load_workbook(out)
-        ws = wb["Data"]
-        vals = []
-        for r in range(2, 20):
-            v = ws.cell(row=r, column=2).value
-            if v is not None:
-                vals.append(v)
+        vals = _read_report_column(out, "Data", 2)[1:]
         self.assertIn(10, vals)
         self.assertIn(5, vals)
-        wb.close()
 
     def test_regenerate_with_overrides(self):
         tpl_path = os.path.join(self.tmpdir, "template3.xlsx")
         generate_input_template(self.rpt_path, tpl_path)
 
         # Modify an input value in the template
-        wb_tpl = load_workbook(tpl_path)
-        ws_tpl = wb_tpl["Data"]
-        # Find and change Price=10 to 20
-        for r in range(2, 20):
-            if ws_tpl.cell(row=r, column=1).value == "A2":
-                ws_tpl.cell(row=r, column=2, value=20)
-                break
-        wb_tpl.save(tpl_path)
-        wb_tpl.close()
+        with open_wb(tpl_path) as wb_tpl:
+            ws_tpl = wb_tpl["Data"]
+            # Find and change Price=10 to 20
+            for cell_ref, value_cell in ws_tpl.iter_rows(
+                    min_row=2, max_row=19, max_col=2):
+                if cell_ref.value == "A2":
+                    value_cell.value = 20
+                    break
+            wb_tpl.save(tpl_path)
 
         out = os.path.join(self.tmpdir, "regen_override.xlsx")
         regenerate_workbook(self.rpt_path, out, input_values_path=tpl_path)
-        wb = load_workbook(out)
-        ws = wb["Data"]
-        self.assertEqual(ws["A2"].value, 20)
-        wb.close()
+        with open_wb(out, read_only=True) as wb:
+            ws = wb["Data"]
+            self.assertEqual(ws["A2"].value, 20)
 
 
 class TestIncludeFlagFiltering(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.wb_path = os.path.join(cls.tmpdir, "simple.xlsx")
-        _create_simple_workbook(cls.wb_path)
+        cls.wb_path = _shared_workbook(_create_simple_workbook)
+        cls.tmpdir = tempfile.mkdtemp(dir=_MODULE_TMPDIR)
         cls.rpt_path = os.path.join(cls.tmpdir, "report.xlsx")
-        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        generate_mapping_report(cls.wb_path, output_path=cls.rpt_path,
+                                classified=_classified(cls.wb_path))
 
     def test_exclude_row(self):
         """When IncludeFlag is set to False the cell should be absent."""
         # Modify the mapping report: set IncludeFlag=False for D2 (output)
-        wb_rpt = load_workbook(self.rpt_path)
-        ws = wb_rpt["Data"]
-        # Find the IncludeFlag column
-        include_col = None
-        for c in range(1, ws.max_column + 1):
-            if ws.cell(row=1, column=c).value == "IncludeFlag":
-                include_col = c
-                break
-        cell_col = None
-        for c in range(1, ws.max_column + 1):
-            if ws.cell(row=1, column=c).value == "Cell":
-                cell_col = c
-                break
-        # Find D2 row and set IncludeFlag to False
-        for r in range(2, ws.max_row + 1):
-            if ws.cell(row=r, column=cell_col).value == "D2":
-                ws.cell(row=r, column=include_col, value=False)
-                break
-        modified_rpt = os.path.join(self.tmpdir, "report_modified.xlsx")
-        wb_rpt.save(modified_rpt)
-        wb_rpt.close()
+        with open_wb(self.rpt_path) as wb_rpt:
+            ws = wb_rpt["Data"]
+            # Locate the Cell and IncludeFlag columns (0-based)
+            header = next(ws.iter_rows(max_row=1, values_only=True))
+            include_idx = header.index("IncludeFlag")
+            cell_idx = header.index("Cell")
+            # Find D2 row and set IncludeFlag to False
+            for row in ws.iter_rows(min_row=2):
+                if row[cell_idx].value == "D2":
+                    row[include_idx].value = False
+                    break
+            modified_rpt = os.path.join(self.tmpdir, "report_modified.xlsx")
+            wb_rpt.save(modified_rpt)
 
         out = os.path.join(self.tmpdir, "regen_filtered.xlsx")
         regenerate_workbook(modified_rpt, out)
-        wb = load_workbook(out)
-        ws_out = wb["Data"]
-        # D2 should be None (excluded)
-        self.assertIsNone(ws_out["D2"].value)
-        # C2 should still be present
-        self.assertEqual(ws_out["C2"].value, "=A2*B2")
-        wb.close()
+        with open_wb(out, read_only=True) as wb:
+            ws_out = wb["Data"]
+            # D2 should be None (excluded)
+            self.assertIsNone(ws_out["D2"].value)
+            # C2 should still be present
+            self.assertEqual(ws_out["C2"].value, "=A2*B2")
 
 
 if __name__ == "__main__":
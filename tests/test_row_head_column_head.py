@@ -3,26 +3,21 @@ Tests for the row_head and column_head sampling strategies, the updated
 dispatch logic (all 5 modes), and the Annotated Field tool documentation.
 """
 
+import io
 import os
 import sys
-import json
+from itertools import chain
 import pytest
 
 # Make the mcp_server package and tests directory importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_server"))
 sys.path.insert(0, os.path.dirname(__file__))
 
-from create_sample_workbook import create_sample_workbook
+from tests.helpers import SAMPLE_SHEETS, result_shape_ok, write_cells
+from tests.mode_dispatch import DISPATCH, dispatch
 
 from openpyxl.utils import get_column_letter
 
-from excel_reader_smart_sampler import (
-    extract_sheet_data as smart_extract,
-    sheet_names,
-    DEFAULT_SAMPLE_ROWS,
-)
-from fetcher_full import extract_sheet_data as full_extract
-from fetcher_column_n import extract_sheet_data as column_n_extract
 from fetcher_row_head import (
     extract_sheet_data as row_head_extract,
     _allocate_budget,
@@ -33,7 +28,7 @@ from fetcher_column_head import (
     _allocate_col_budget,
     column_head_indices,
 )
-from fetcher_smart_random import load_sheet_frames, detect_regions
+from fetcher_smart_random import Region, load_sheet_frames, detect_regions
 
 
 # ---------------------------------------------------------------------------
@@ -41,44 +36,43 @@ from fetcher_smart_random import load_sheet_frames, detect_regions
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(scope="module")
-def sample_wb(tmp_path_factory):
-    """Create the sample workbook once per test module."""
-    path = str(tmp_path_factory.mktemp("data") / "sample.xlsx")
-    create_sample_workbook(path)
-    return path
+def row_head_inputs(sample_wb):
+    """row_head extraction of the Inputs sheet at the default budget."""
+    return row_head_extract(sample_wb, "Inputs", max_rows=100)
+
+
+@pytest.fixture(scope="module")
+def column_head_inputs(sample_wb):
+    """column_head extraction of the Inputs sheet at the default budget."""
+    return column_head_extract(sample_wb, "Inputs")
 
 
 @pytest.fixture(scope="module")
 def wide_wb(tmp_path_factory):
     """Create a wide workbook (many date columns) for column_head testing."""
-    from openpyxl import Workbook
     path = str(tmp_path_factory.mktemp("data") / "wide.xlsx")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "PnL"
 
     # Header row: Entity + 24 quarterly date columns
-    ws.cell(row=1, column=1, value="Entity")
+    cells = [(1, 1, "Entity")]
     for i in range(24):
         year = 2023 + i // 4
         quarter = (i % 4) + 1
-        ws.cell(row=1, column=i + 2, value=f"Q{quarter} {year}")
+        cells.append((1, i + 2, f"Q{quarter} {year}"))
 
     # Data rows: financial entities
     entities = ["Revenue", "COGS", "Gross Profit", "OpEx", "EBITDA",
                 "Depreciation", "EBIT", "Interest", "Tax", "Net Income"]
     for r, entity in enumerate(entities, start=2):
-        ws.cell(row=r, column=1, value=entity)
-        for c in range(2, 26):
-            ws.cell(row=r, column=c, value=(r * 1000 + c))
+        cells.append((r, 1, entity))
+        cells.extend((r, c, r * 1000 + c) for c in range(2, 26))
 
     # Add a formula row
-    ws.cell(row=12, column=1, value="Total Check")
-    for c in range(2, 26):
-        ws.cell(row=12, column=c, value=f"=SUM(B{2}:{get_column_letter(c)}{11})")
+    col_letters = [get_column_letter(c) for c in range(2, 26)]
+    formulas = [f"=SUM(B2:{letter}11)" for letter in col_letters]
+    cells.extend((12, c, v)
+                 for c, v in enumerate(["Total Check"] + formulas, start=1))
 
-    wb.save(path)
-    wb.close()
+    write_cells(path, "PnL", cells)
     return path
 
 
@@ -87,74 +81,42 @@ def multi_patch_wb(tmp_path_factory):
     """Create a workbook with multiple data patches separated by blank rows."""
     from openpyxl import Workbook
     path = str(tmp_path_factory.mktemp("data") / "multi_patch.xlsx")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Data"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Data")
 
     # Patch 1: rows 1-5 (header + 4 data rows)
-    ws["A1"] = "Name"
-    ws["B1"] = "Value"
+    ws.append(["Name", "Value"])
     for i in range(2, 6):
-        ws[f"A{i}"] = f"Item{i-1}"
-        ws[f"B{i}"] = i * 10
+        ws.append([f"Item{i-1}", i * 10])
 
-    # blank row 6
+    ws.append([])  # blank row 6
 
     # Patch 2: rows 7-16 (header + 9 data rows)
-    ws["A7"] = "Category"
-    ws["B7"] = "Amount"
-    ws["C7"] = "Tax"
+    ws.append(["Category", "Amount", "Tax"])
     for i in range(8, 17):
-        ws[f"A{i}"] = f"Cat{i-7}"
-        ws[f"B{i}"] = i * 100
-        ws[f"C{i}"] = f"=B{i}*0.1"
+        ws.append([f"Cat{i-7}", i * 100, f"=B{i}*0.1"])
 
-    # blank row 17
+    ws.append([])  # blank row 17
 
     # Patch 3: rows 18-20 (header + 2 data rows)
-    ws["A18"] = "Summary"
-    ws["B18"] = "Total"
-    ws["A19"] = "Grand Total"
-    ws["B19"] = "=SUM(B2:B5)+SUM(B8:B16)"
-    ws["A20"] = "Tax Total"
-    ws["B20"] = "=SUM(C8:C16)"
+    ws.append(["Summary", "Total"])
+    ws.append(["Grand Total", "=SUM(B2:B5)+SUM(B8:B16)"])
+    ws.append(["Tax Total", "=SUM(C8:C16)"])
 
     wb.save(path)
     wb.close()
     return path
 
 
-# ---------------------------------------------------------------------------
-# Helpers for assertions
-# ---------------------------------------------------------------------------
-
-def _result_shape_ok(data: dict):
-    """Assert that *data* has the standard result dict shape."""
-    assert "sheet_name" in data
-    assert "regions" in data
-    assert isinstance(data["regions"], list)
-    assert "sampled" in data
-    assert "total_rows" in data
-    assert "sampled_rows" in data
-    for reg in data["regions"]:
-        assert "headers" in reg
-        assert "rows" in reg
-        assert "formulas" in reg
-        assert "min_row" in reg
-        assert "max_row" in reg
-        assert "min_col" in reg
-        assert "max_col" in reg
-
-
 # ===========================================================================
 # row_head strategy
 # ===========================================================================
 
 class TestRowHead:
 
-    def test_basic_extraction(self, sample_wb):
-        data = row_head_extract(sample_wb, "Inputs")
-        _result_shape_ok(data)
+    def test_basic_extraction(self, row_head_inputs):
+        data = row_head_inputs
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
     def test_headers_always_captured(self, sample_wb):
@@ -164,17 +126,14 @@ class TestRowHead:
             if reg["headers"]:
                 assert len(reg["headers"]) > 0
 
-    def test_formulas_present(self, sample_wb):
-        data = row_head_extract(sample_wb, "Inputs", max_rows=100)
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+    def test_formulas_present(self, row_head_inputs):
+        data = row_head_inputs
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
-    def test_all_sheets(self, sample_wb):
-        for name in sheet_names(sample_wb):
-            data = row_head_extract(sample_wb, name)
-            _result_shape_ok(data)
+    @pytest.mark.parametrize("sheet", SAMPLE_SHEETS)
+    def test_all_sheets(self, sample_wb, sheet):
+        result_shape_ok(row_head_extract(sample_wb, sheet))
 
     def test_budget_is_per_sheet(self, sample_wb):
         """The max_rows budget is per sheet (across all patches)."""
@@ -184,10 +143,8 @@ class TestRowHead:
     def test_budget_allocation_proportional(self):
         """Budget is divided across patches proportionally to their size."""
         regions = [
-            {"min_row": 1, "max_row": 100, "min_col": 1, "max_col": 5,
-             "header_row": 1},
-            {"min_row": 110, "max_row": 119, "min_col": 1, "max_col": 5,
-             "header_row": 110},
+            Region(1, 100, 1, 5, 1),
+            Region(110, 119, 1, 5, 110),
         ]
         budgets = _allocate_budget(regions, 20)
         # Larger region should get a bigger budget
@@ -196,15 +153,13 @@ class TestRowHead:
 
     def test_row_head_indices_includes_header(self):
         """row_head_indices must always include the header row."""
-        reg = {"min_row": 5, "max_row": 20, "min_col": 1, "max_col": 3,
-               "header_row": 5}
+        reg = Region(5, 20, 1, 3, 5)
         indices = row_head_indices(reg, 5)
         assert 5 in indices  # header row
 
     def test_row_head_indices_contiguous(self):
         """Rows selected should be header + contiguous head rows."""
-        reg = {"min_row": 5, "max_row": 20, "min_col": 1, "max_col": 3,
-               "header_row": 5}
+        reg = Region(5, 20, 1, 3, 5)
         indices = row_head_indices(reg, 5)
         # Should be [5, 6, 7, 8, 9]
         assert indices == [5, 6, 7, 8, 9]
@@ -212,7 +167,7 @@ class TestRowHead:
     def test_multi_patch_all_headers_captured(self, multi_patch_wb):
         """For a multi-patch workbook, row_head must capture all headers."""
         data = row_head_extract(multi_patch_wb, "Data", max_rows=10)
-        _result_shape_ok(data)
+        result_shape_ok(data)
         # There should be multiple regions, each with headers
         assert len(data["regions"]) >= 2
         for reg in data["regions"]:
@@ -237,7 +192,7 @@ class TestRowHeadEmptySheet:
         wb.close()
 
         data = row_head_extract(path, "Sheet")
-        _result_shape_ok(data)
+        result_shape_ok(data)
         assert data["total_rows"] == 0
 
 
@@ -247,9 +202,9 @@ class TestRowHeadEmptySheet:
 
 class TestColumnHead:
 
-    def test_basic_extraction(self, sample_wb):
-        data = column_head_extract(sample_wb, "Inputs")
-        _result_shape_ok(data)
+    def test_basic_extraction(self, column_head_inputs):
+        data = column_head_inputs
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
     def test_all_rows_included(self, sample_wb):
@@ -268,28 +223,25 @@ class TestColumnHead:
             col_span = reg["max_col"] - reg["min_col"] + 1
             assert col_span <= 2
 
-    def test_headers_captured(self, sample_wb):
-        data = column_head_extract(sample_wb, "Inputs")
+    def test_headers_captured(self, column_head_inputs):
+        data = column_head_inputs
         for reg in data["regions"]:
             if reg["headers"]:
                 assert len(reg["headers"]) > 0
 
     def test_formulas_present(self, sample_wb):
         data = column_head_extract(sample_wb, "Inputs", max_cols=10)
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
-    def test_all_sheets(self, sample_wb):
-        for name in sheet_names(sample_wb):
-            data = column_head_extract(sample_wb, name)
-            _result_shape_ok(data)
+    @pytest.mark.parametrize("sheet", SAMPLE_SHEETS)
+    def test_all_sheets(self, sample_wb, sheet):
+        result_shape_ok(column_head_extract(sample_wb, sheet))
 
     def test_wide_sheet_column_limiting(self, wide_wb):
         """On a wide sheet (25 cols), column_head should limit columns."""
         data = column_head_extract(wide_wb, "PnL", max_cols=5)
-        _result_shape_ok(data)
+        result_shape_ok(data)
         for reg in data["regions"]:
             col_span = reg["max_col"] - reg["min_col"] + 1
             assert col_span <= 5
@@ -309,10 +261,8 @@ class TestColumnHead:
     def test_budget_allocation_proportional(self):
         """Budget is divided across patches proportionally to their width."""
         regions = [
-            {"min_row": 1, "max_row": 10, "min_col": 1, "max_col": 20,
-             "header_row": 1},
-            {"min_row": 15, "max_row": 25, "min_col": 1, "max_col": 5,
-             "header_row": 15},
+            Region(1, 10, 1, 20, 1),
+            Region(15, 25, 1, 5, 15),
         ]
         budgets = _allocate_col_budget(regions, 15)
         # Wider region should get a bigger budget
@@ -320,8 +270,7 @@ class TestColumnHead:
 
     def test_column_head_indices_start_from_min(self):
         """column_head_indices should start from the region's min_col."""
-        reg = {"min_row": 1, "max_row": 10, "min_col": 3, "max_col": 20,
-               "header_row": 1}
+        reg = Region(1, 10, 3, 20, 1)
         indices = column_head_indices(reg, 5)
         assert indices == [3, 4, 5, 6, 7]
 
@@ -344,7 +293,7 @@ class TestColumnHeadEmptySheet:
         wb.close()
 
         data = column_head_extract(path, "Sheet")
-        _result_shape_ok(data)
+        result_shape_ok(data)
         assert data["total_rows"] == 0
 
 
@@ -355,70 +304,24 @@ class TestColumnHeadEmptySheet:
 class TestDispatchAllModes:
     """Test the dispatch logic mirrors server._dispatch_extract for all 5 modes."""
 
-    def _dispatch(self, mode, path, sheet_name, **kwargs):
-        mode = mode.lower().strip()
-        valid = ("smart_random", "full", "column_n", "row_head", "column_head")
-        if mode not in valid:
-            raise ValueError(f"Invalid mode '{mode}'. Must be one of {valid}.")
-        if mode == "smart_random":
-            return smart_extract(path, sheet_name,
-                                 max_sample_rows=kwargs.get("max_sample_rows",
-                                                            DEFAULT_SAMPLE_ROWS))
-        elif mode == "full":
-            return full_extract(path, sheet_name,
-                                nrows=kwargs.get("nrows"),
-                                ncols=kwargs.get("ncols"))
-        elif mode == "column_n":
-            return column_n_extract(path, sheet_name,
-                                    num_columns=kwargs.get("num_columns", 10))
-        elif mode == "row_head":
-            return row_head_extract(path, sheet_name,
-                                    max_rows=kwargs.get("max_sample_rows",
-                                                        DEFAULT_SAMPLE_ROWS))
-        elif mode == "column_head":
-            return column_head_extract(path, sheet_name,
-                                       max_cols=kwargs.get("max_cols", 20))
-
-    def test_smart_random_dispatch(self, sample_wb):
-        data = self._dispatch("smart_random", sample_wb, "Inputs")
-        _result_shape_ok(data)
-
-    def test_full_dispatch(self, sample_wb):
-        data = self._dispatch("full", sample_wb, "Inputs")
-        _result_shape_ok(data)
-
-    def test_column_n_dispatch(self, sample_wb):
-        data = self._dispatch("column_n", sample_wb, "Inputs")
-        _result_shape_ok(data)
-
-    def test_row_head_dispatch(self, sample_wb):
-        data = self._dispatch("row_head", sample_wb, "Inputs")
-        _result_shape_ok(data)
-
-    def test_column_head_dispatch(self, sample_wb):
-        data = self._dispatch("column_head", sample_wb, "Inputs")
-        _result_shape_ok(data)
+    @pytest.mark.parametrize("mode", list(DISPATCH))
+    def test_dispatch(self, sample_wb, mode):
+        result_shape_ok(dispatch(mode, sample_wb, "Inputs"))
 
     def test_invalid_mode_raises(self, sample_wb):
         with pytest.raises(ValueError, match="Invalid mode"):
-            self._dispatch("nonexistent", sample_wb, "Inputs")
-
-    def test_all_five_modes_produce_valid_output(self, sample_wb):
-        """All five modes should produce structurally valid output."""
-        for mode in ("smart_random", "full", "column_n", "row_head", "column_head"):
-            data = self._dispatch(mode, sample_wb, "Inputs")
-            _result_shape_ok(data)
+            dispatch("nonexistent", sample_wb, "Inputs")
 
     def test_modes_produce_different_output(self, sample_wb):
         """Different modes can produce different row/col counts."""
-        d_smart = self._dispatch("smart_random", sample_wb, "Inputs")
-        d_full = self._dispatch("full", sample_wb, "Inputs")
-        d_coln = self._dispatch("column_n", sample_wb, "Inputs", num_columns=2)
-        d_rowh = self._dispatch("row_head", sample_wb, "Inputs")
-        d_colh = self._dispatch("column_head", sample_wb, "Inputs", max_cols=2)
+        d_smart = dispatch("smart_random", sample_wb, "Inputs")
+        d_full = dispatch("full", sample_wb, "Inputs")
+        d_coln = dispatch("column_n", sample_wb, "Inputs", num_columns=2)
+        d_rowh = dispatch("row_head", sample_wb, "Inputs")
+        d_colh = dispatch("column_head", sample_wb, "Inputs", max_cols=2)
 
         for d in (d_smart, d_full, d_coln, d_rowh, d_colh):
-            _result_shape_ok(d)
+            result_shape_ok(d)
 
 
 # ===========================================================================
@@ -427,57 +330,37 @@ class TestDispatchAllModes:
 
 class TestBudgetAllocation:
 
-    def test_allocate_budget_empty(self):
-        assert _allocate_budget([], 100) == []
-
-    def test_allocate_budget_single_region(self):
-        regions = [{"min_row": 1, "max_row": 50, "min_col": 1, "max_col": 5,
-                     "header_row": 1}]
-        budgets = _allocate_budget(regions, 20)
-        assert budgets[0] == 20
-
-    def test_allocate_budget_caps_to_region_size(self):
-        """Budget per region should not exceed actual region row count."""
-        regions = [{"min_row": 1, "max_row": 5, "min_col": 1, "max_col": 3,
-                     "header_row": 1}]
-        budgets = _allocate_budget(regions, 100)
-        assert budgets[0] == 5  # only 5 rows in region
-
-    def test_allocate_col_budget_empty(self):
-        assert _allocate_col_budget([], 100) == []
-
-    def test_allocate_col_budget_single_region(self):
-        regions = [{"min_row": 1, "max_row": 10, "min_col": 1, "max_col": 30,
-                     "header_row": 1}]
-        budgets = _allocate_col_budget(regions, 10)
-        assert budgets[0] == 10
-
-    def test_allocate_col_budget_caps_to_region_width(self):
-        """Budget per region should not exceed actual region column count."""
-        regions = [{"min_row": 1, "max_row": 10, "min_col": 1, "max_col": 3,
-                     "header_row": 1}]
-        budgets = _allocate_col_budget(regions, 100)
-        assert budgets[0] == 3  # only 3 cols in region
-
-    def test_allocate_budget_no_overrun_many_regions(self):
-        """With many regions and small budget, total should not exceed budget."""
-        regions = [
-            {"min_row": i * 20, "max_row": i * 20 + 10,
-             "min_col": 1, "max_col": 5, "header_row": i * 20}
-            for i in range(10)
-        ]
-        budgets = _allocate_budget(regions, 10)
-        assert sum(budgets) <= 10
-
-    def test_allocate_col_budget_no_overrun_many_regions(self):
+    @pytest.mark.parametrize("regions,budget,expected", [
+        ([], 100, []),
+        ([Region(1, 50, 1, 5, 1)], 20, [20]),
+        # Budget per region should not exceed actual region row count
+        ([Region(1, 5, 1, 3, 1)], 100, [5]),
+        ([Region(1, 5, 1, 3, 1)], 0, [0]),
+    ], ids=["empty", "single_region", "caps_to_region_size", "zero_budget"])
+    def test_allocate_budget(self, regions, budget, expected):
+        assert _allocate_budget(regions, budget) == expected
+
+    @pytest.mark.parametrize("regions,budget,expected", [
+        ([], 100, []),
+        ([Region(1, 10, 1, 30, 1)], 10, [10]),
+        # Budget per region should not exceed actual region column count
+        ([Region(1, 10, 1, 3, 1)], 100, [3]),
+        ([Region(1, 10, 1, 3, 1)], 0, [0]),
+    ], ids=["empty", "single_region", "caps_to_region_width", "zero_budget"])
+    def test_allocate_col_budget(self, regions, budget, expected):
+        assert _allocate_col_budget(regions, budget) == expected
+
+    @pytest.mark.parametrize("allocate,max_col", [
+        (_allocate_budget, 5),
+        (_allocate_col_budget, 20),
+    ], ids=["rows", "cols"])
+    def test_no_overrun_many_regions(self, allocate, max_col):
         """With many regions and small budget, total should not exceed budget."""
         regions = [
-            {"min_row": i * 20, "max_row": i * 20 + 10,
-             "min_col": 1, "max_col": 20, "header_row": i * 20}
+            Region(i * 20, i * 20 + 10, 1, max_col, i * 20)
             for i in range(10)
         ]
-        budgets = _allocate_col_budget(regions, 10)
-        assert sum(budgets) <= 10
+        assert sum(allocate(regions, 10)) <= 10
 
 
 # ===========================================================================
@@ -486,40 +369,38 @@ class TestBudgetAllocation:
 
 class TestFormattersIntegration:
 
-    def test_row_head_markdown(self, sample_wb):
-        from formatters import to_markdown
-        data = row_head_extract(sample_wb, "Inputs")
-        md = to_markdown(data)
-        assert "Sheet: Inputs" in md
+    def test_row_head_markdown(self, row_head_inputs):
+        from formatters import to_markdown_stream
+        buf = io.StringIO()
+        to_markdown_stream(row_head_inputs, buf)
+        assert "Sheet: Inputs" in buf.getvalue()
 
-    def test_row_head_json(self, sample_wb):
+    def test_row_head_json(self, row_head_inputs):
         from formatters import to_json
-        data = row_head_extract(sample_wb, "Inputs")
+        data = row_head_inputs
         result = to_json(data)
-        parsed = json.loads(result)
-        assert parsed["sheet_name"] == "Inputs"
-
-    def test_row_head_xml(self, sample_wb):
-        from formatters import to_xml
-        data = row_head_extract(sample_wb, "Inputs")
-        xml_str = to_xml(data)
-        assert "Inputs" in xml_str
-
-    def test_column_head_markdown(self, sample_wb):
-        from formatters import to_markdown
-        data = column_head_extract(sample_wb, "Inputs")
-        md = to_markdown(data)
-        assert "Sheet: Inputs" in md
-
-    def test_column_head_json(self, sample_wb):
+        assert '"sheet_name": "Inputs"' in result
+
+    def test_row_head_xml(self, row_head_inputs):
+        from formatters import to_xml_stream
+        buf = io.StringIO()
+        to_xml_stream(row_head_inputs, buf)
+        assert "Inputs" in buf.getvalue()
+
+    def test_column_head_markdown(self, column_head_inputs):
+        from formatters import to_markdown_stream
+        buf = io.StringIO()
+        to_markdown_stream(column_head_inputs, buf)
+        assert "Sheet: Inputs" in buf.getvalue()
+
+    def test_column_head_json(self, column_head_inputs):
         from formatters import to_json
-        data = column_head_extract(sample_wb, "Inputs")
+        data = column_head_inputs
         result = to_json(data)
-        parsed = json.loads(result)
-        assert parsed["sheet_name"] == "Inputs"
-
-    def test_column_head_xml(self, sample_wb):
-        from formatters import to_xml
-        data = column_head_extract(sample_wb, "Inputs")
-        xml_str = to_xml(data)
-        assert "Inputs" in xml_str
+        assert '"sheet_name": "Inputs"' in result
+
+    def test_column_head_xml(self, column_head_inputs):
+        from formatters import to_xml_stream
+        buf = io.StringIO()
+        to_xml_stream(column_head_inputs, buf)
+        assert "Inputs" in buf.getvalue()
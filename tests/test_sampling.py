@@ -6,13 +6,16 @@ and for the MCP-server dispatch logic.
 import os
 import sys
 import json
+from itertools import chain
 import pytest
 
 # Make the mcp_server package and tests directory importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_server"))
 sys.path.insert(0, os.path.dirname(__file__))
 
-from create_sample_workbook import create_sample_workbook
+from tests.helpers import SAMPLE_SHEETS, result_shape_ok
+from tests.mode_dispatch import dispatch
+
 
 # Import samplers
 from excel_reader_smart_sampler import (
@@ -22,7 +25,6 @@ from excel_reader_smart_sampler import (
     sheet_names,
     detect_regions,
     open_workbook,
-    DEFAULT_SAMPLE_ROWS,
 )
 from fetcher_full import extract_sheet_data as full_extract
 from fetcher_column_n import extract_sheet_data as column_n_extract
@@ -33,33 +35,21 @@ from fetcher_column_n import extract_sheet_data as column_n_extract
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(scope="module")
-def sample_wb(tmp_path_factory):
-    """Create the sample workbook once per test module."""
-    path = str(tmp_path_factory.mktemp("data") / "sample.xlsx")
-    create_sample_workbook(path)
-    return path
+def smart_inputs(sample_wb):
+    """smart_random extraction of the Inputs sheet with default settings."""
+    return smart_extract(sample_wb, "Inputs")
 
 
-# ---------------------------------------------------------------------------
-# Helpers for assertions
-# ---------------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def full_inputs(sample_wb):
+    """full extraction of the Inputs sheet with no row/column caps."""
+    return full_extract(sample_wb, "Inputs")
+
 
-def _result_shape_ok(data: dict):
-    """Assert that *data* has the standard result dict shape."""
-    assert "sheet_name" in data
-    assert "regions" in data
-    assert isinstance(data["regions"], list)
-    assert "sampled" in data
-    assert "total_rows" in data
-    assert "sampled_rows" in data
-    for reg in data["regions"]:
-        assert "headers" in reg
-        assert "rows" in reg
-        assert "formulas" in reg
-        assert "min_row" in reg
-        assert "max_row" in reg
-        assert "min_col" in reg
-        assert "max_col" in reg
+@pytest.fixture(scope="module")
+def column_n_inputs(sample_wb):
+    """column_n extraction of the Inputs sheet at the default strip width."""
+    return column_n_extract(sample_wb, "Inputs")
 
 
 # ---------------------------------------------------------------------------
@@ -68,23 +58,21 @@ def _result_shape_ok(data: dict):
 
 class TestSmartRandom:
 
-    def test_basic_extraction(self, sample_wb):
-        data = smart_extract(sample_wb, "Inputs")
-        _result_shape_ok(data)
+    def test_basic_extraction(self, smart_inputs):
+        data = smart_inputs
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
-    def test_sampling_flag_small_sheet(self, sample_wb):
+    def test_sampling_flag_small_sheet(self, smart_inputs):
         """The sample workbook is small — sampling should NOT be applied."""
-        data = smart_extract(sample_wb, "Inputs")
+        data = smart_inputs
         # With default max rows (100) and a tiny test sheet, sampled should be False
         assert data["sampled"] is False
 
-    def test_formulas_present(self, sample_wb):
-        data = smart_extract(sample_wb, "Inputs")
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+    def test_formulas_present(self, smart_inputs):
+        data = smart_inputs
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
     def test_extract_formulas_function(self, sample_wb):
         formulas = extract_formulas(sample_wb, "Inputs")
@@ -106,6 +94,8 @@ class TestSmartRandom:
         names = sheet_names(sample_wb)
         assert "Inputs" in names
         assert "Summary" in names
+        # Per-sheet tests are parametrized over SAMPLE_SHEETS
+        assert tuple(names) == SAMPLE_SHEETS
 
 
 # ---------------------------------------------------------------------------
@@ -114,14 +104,14 @@ class TestSmartRandom:
 
 class TestFull:
 
-    def test_basic_extraction(self, sample_wb):
-        data = full_extract(sample_wb, "Inputs")
-        _result_shape_ok(data)
+    def test_basic_extraction(self, full_inputs):
+        data = full_inputs
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
-    def test_all_rows_loaded(self, sample_wb):
+    def test_all_rows_loaded(self, full_inputs):
         """Full mode with nrows=None should load every row."""
-        data = full_extract(sample_wb, "Inputs")
+        data = full_inputs
         assert data["sampled"] is False
         assert data["sampled_rows"] == data["total_rows"]
 
@@ -132,23 +122,19 @@ class TestFull:
             assert row_span <= 3
 
     def test_ncols_cap(self, sample_wb):
-        data_full = full_extract(sample_wb, "Inputs")
         data_capped = full_extract(sample_wb, "Inputs", ncols=2)
         for reg in data_capped["regions"]:
             col_span = reg["max_col"] - reg["min_col"] + 1
             assert col_span <= 2
 
-    def test_formulas_present(self, sample_wb):
-        data = full_extract(sample_wb, "Inputs")
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+    def test_formulas_present(self, full_inputs):
+        data = full_inputs
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
-    def test_all_sheets(self, sample_wb):
-        for name in sheet_names(sample_wb):
-            data = full_extract(sample_wb, name)
-            _result_shape_ok(data)
+    @pytest.mark.parametrize("sheet", SAMPLE_SHEETS)
+    def test_all_sheets(self, sample_wb, sheet):
+        result_shape_ok(full_extract(sample_wb, sheet))
 
 
 # ---------------------------------------------------------------------------
@@ -157,9 +143,9 @@ class TestFull:
 
 class TestColumnN:
 
-    def test_basic_extraction(self, sample_wb):
-        data = column_n_extract(sample_wb, "Inputs")
-        _result_shape_ok(data)
+    def test_basic_extraction(self, column_n_inputs):
+        data = column_n_inputs
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
     def test_strip_width(self, sample_wb):
@@ -177,22 +163,19 @@ class TestColumnN:
             col_span = reg["max_col"] - reg["min_col"] + 1
             assert col_span <= 11
 
-    def test_all_rows_included(self, sample_wb):
+    def test_all_rows_included(self, column_n_inputs):
         """column_n loads ALL rows in the strip."""
-        data = column_n_extract(sample_wb, "Inputs")
+        data = column_n_inputs
         assert data["sampled"] is False
 
-    def test_formulas_present(self, sample_wb):
-        data = column_n_extract(sample_wb, "Inputs", num_columns=10)
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+    def test_formulas_present(self, column_n_inputs):
+        data = column_n_inputs
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
-    def test_all_sheets(self, sample_wb):
-        for name in sheet_names(sample_wb):
-            data = column_n_extract(sample_wb, name)
-            _result_shape_ok(data)
+    @pytest.mark.parametrize("sheet", SAMPLE_SHEETS)
+    def test_all_sheets(self, sample_wb, sheet):
+        result_shape_ok(column_n_extract(sample_wb, sheet))
 
 
 # ---------------------------------------------------------------------------
@@ -201,45 +184,27 @@ class TestColumnN:
 
 class TestDispatch:
 
-    def _dispatch(self, mode, path, sheet_name, **kwargs):
-        """Replicates the dispatch logic from server.py."""
-        mode = mode.lower().strip()
-        valid = ("smart_random", "full", "column_n")
-        if mode not in valid:
-            raise ValueError(f"Invalid mode '{mode}'. Must be one of {valid}.")
-        if mode == "smart_random":
-            return smart_extract(path, sheet_name,
-                                 max_sample_rows=kwargs.get("max_sample_rows",
-                                                            DEFAULT_SAMPLE_ROWS))
-        elif mode == "full":
-            return full_extract(path, sheet_name,
-                                nrows=kwargs.get("nrows"),
-                                ncols=kwargs.get("ncols"))
-        elif mode == "column_n":
-            return column_n_extract(path, sheet_name,
-                                    num_columns=kwargs.get("num_columns", 10))
-
     def test_smart_random_dispatch(self, sample_wb):
-        data = self._dispatch("smart_random", sample_wb, "Inputs")
-        _result_shape_ok(data)
+        data = dispatch("smart_random", sample_wb, "Inputs")
+        result_shape_ok(data)
 
     def test_full_dispatch(self, sample_wb):
-        data = self._dispatch("full", sample_wb, "Inputs")
-        _result_shape_ok(data)
+        data = dispatch("full", sample_wb, "Inputs")
+        result_shape_ok(data)
 
     def test_column_n_dispatch(self, sample_wb):
-        data = self._dispatch("column_n", sample_wb, "Inputs")
-        _result_shape_ok(data)
+        data = dispatch("column_n", sample_wb, "Inputs")
+        result_shape_ok(data)
 
     def test_invalid_mode_raises(self, sample_wb):
         with pytest.raises(ValueError, match="Invalid mode"):
-            self._dispatch("nonexistent", sample_wb, "Inputs")
+            dispatch("nonexistent", sample_wb, "Inputs")
 
     def test_modes_produce_different_output(self, sample_wb):
         """The three modes should produce structurally valid but potentially
         different data (e.g. different column counts for column_n)."""
-        d1 = self._dispatch("smart_random", sample_wb, "Inputs")
-        d2 = self._dispatch("full", sample_wb, "Inputs")
-        d3 = self._dispatch("column_n", sample_wb, "Inputs", num_columns=2)
+        d1 = dispatch("smart_random", sample_wb, "Inputs")
+        d2 = dispatch("full", sample_wb, "Inputs")
+        d3 = dispatch("column_n", sample_wb, "Inputs", num_columns=2)
         for d in (d1, d2, d3):
-            _result_shape_ok(d)
+            result_shape_ok(d)
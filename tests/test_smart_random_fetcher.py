@@ -4,6 +4,7 @@ Tests for the vectorized smart_random_fetcher module.
 
 import os
 import sys
+from itertools import chain
 
 import pytest
 
@@ -11,52 +12,21 @@ import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_server"))
 sys.path.insert(0, os.path.dirname(__file__))
 
-from create_sample_workbook import create_sample_workbook
+from tests.helpers import SAMPLE_SHEETS, result_shape_ok
+
 from fetcher_smart_random import (
     extract_sheet_data,
     load_sheet_frames,
+    iter_sheet_frames,
     detect_regions,
     sampled_cells,
     highlight_workbook,
+    HIGHLIGHT_FILL,
     sample_row_indices,
     DEFAULT_SAMPLE_ROWS,
 )
 
 
-# ---------------------------------------------------------------------------
-# Fixtures
-# ---------------------------------------------------------------------------
-
-@pytest.fixture(scope="module")
-def sample_wb(tmp_path_factory):
-    """Create the sample workbook once per test module."""
-    path = str(tmp_path_factory.mktemp("data") / "sample.xlsx")
-    create_sample_workbook(path)
-    return path
-
-
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-def _result_shape_ok(data: dict):
-    """Assert standard result dict shape."""
-    assert "sheet_name" in data
-    assert "regions" in data
-    assert isinstance(data["regions"], list)
-    assert "sampled" in data
-    assert "total_rows" in data
-    assert "sampled_rows" in data
-    for reg in data["regions"]:
-        assert "headers" in reg
-        assert "rows" in reg
-        assert "formulas" in reg
-        assert "min_row" in reg
-        assert "max_row" in reg
-        assert "min_col" in reg
-        assert "max_col" in reg
-
-
 # ---------------------------------------------------------------------------
 # DataFrame loading
 # ---------------------------------------------------------------------------
@@ -71,15 +41,38 @@ class TestLoadFrames:
     def test_formulas_in_frame(self, sample_wb):
         _, df_f = load_sheet_frames(sample_wb, "Inputs")
         # D2 should contain the formula =B2*C2
-        val = df_f.loc[2, 4]  # row 2, col 4 (D)
+        val = df_f.iat[1, 3]  # D2: frames are 1-based, so position is label - 1
         assert isinstance(val, str) and val.startswith("=")
 
     def test_values_frame_no_formulas(self, sample_wb):
         df_v, _ = load_sheet_frames(sample_wb, "Inputs")
         # D2 should hold a cached numeric value, not a formula string
-        val = df_v.loc[2, 4]
+        val = df_v.iat[1, 3]
         assert not (isinstance(val, str) and val.startswith("="))
 
+    def test_iter_sheet_frames_matches_per_sheet_load(self, sample_wb):
+        walked = list(iter_sheet_frames(sample_wb))
+        assert [sn for sn, _, _ in walked] == list(SAMPLE_SHEETS)
+        for sn, df_v, df_f in walked:
+            exp_v, exp_f = load_sheet_frames(sample_wb, sn)
+            assert df_v.equals(exp_v) and df_f.equals(exp_f)
+
+    def test_iter_sheet_frames_parses_once_and_closes(self, sample_wb,
+                                                      monkeypatch):
+        import fetcher_smart_random
+        opened = []
+        real = fetcher_smart_random.load_workbook
+
+        def spy(*args, **kwargs):
+            opened.append(real(*args, **kwargs))
+            return opened[-1]
+
+        monkeypatch.setattr(fetcher_smart_random, "load_workbook", spy)
+        for _ in iter_sheet_frames(sample_wb):
+            pass
+        assert len(opened) == 2  # one values view, one formulas view
+        assert all(wb._archive.fp is None for wb in opened)
+
 
 # ---------------------------------------------------------------------------
 # Region detection
@@ -96,14 +89,14 @@ class TestDetectRegions:
         _, df_f = load_sheet_frames(sample_wb, "Inputs")
         regions = detect_regions(df_f)
         # First region should have a header (row 1 with Item, Price, …)
-        assert regions[0]["header_row"] is not None
+        assert regions[0].header_row is not None
 
     def test_region_bounds(self, sample_wb):
         _, df_f = load_sheet_frames(sample_wb, "Inputs")
         regions = detect_regions(df_f)
         for reg in regions:
-            assert reg["min_row"] <= reg["max_row"]
-            assert reg["min_col"] <= reg["max_col"]
+            assert reg.min_row <= reg.max_row
+            assert reg.min_col <= reg.max_col
 
 
 # ---------------------------------------------------------------------------
@@ -114,39 +107,28 @@ class TestExtraction:
 
     def test_basic_extraction(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Inputs")
-        _result_shape_ok(data)
+        result_shape_ok(data)
         assert data["sheet_name"] == "Inputs"
 
     def test_formulas_present(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Inputs")
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
-        assert len(all_formulas) > 0
+        formulas = chain.from_iterable(r["formulas"] for r in data["regions"])
+        assert next(formulas, None) is not None
 
     def test_values_present(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Inputs")
-        has_value = False
-        for reg in data["regions"]:
-            for row in reg["rows"]:
-                for v in row["values"]:
-                    if v is not None:
-                        has_value = True
-                        break
-        assert has_value
+        assert any(v is not None
+                   for reg in data["regions"]
+                   for row in reg["rows"]
+                   for v in row["values"])
 
     def test_small_sheet_not_sampled(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Inputs")
         assert data["sampled"] is False
 
-    def test_all_sheets(self, sample_wb):
-        from openpyxl import load_workbook
-        wb = load_workbook(sample_wb)
-        names = wb.sheetnames
-        wb.close()
-        for name in names:
-            data = extract_sheet_data(sample_wb, name)
-            _result_shape_ok(data)
+    @pytest.mark.parametrize("sheet", SAMPLE_SHEETS)
+    def test_all_sheets(self, sample_wb, sheet):
+        result_shape_ok(extract_sheet_data(sample_wb, sheet))
 
     def test_headers_detected(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Inputs")
@@ -156,12 +138,9 @@ class TestExtraction:
 
     def test_cross_sheet_formulas(self, sample_wb):
         data = extract_sheet_data(sample_wb, "Summary")
-        all_formulas = []
-        for reg in data["regions"]:
-            all_formulas.extend(reg["formulas"])
         # Summary has formulas referencing Inputs sheet
-        cross = [f for f in all_formulas if "Inputs!" in f["formula"]]
-        assert len(cross) > 0
+        assert any("Inputs!" in f["formula"]
+                   for r in data["regions"] for f in r["formulas"])
 
     def test_isolated_regions_captured(self, sample_wb):
         """Isolated tiny regions (like single-row summaries) are kept whole."""
@@ -196,13 +175,13 @@ class TestHighlighting:
         highlight_workbook(sample_wb, sheet_name="Inputs", output_path=out)
 
         from openpyxl import load_workbook
-        wb = load_workbook(out)
+        wb = load_workbook(out, read_only=True, data_only=False)
         ws = wb["Inputs"]
-        highlighted = 0
-        for r in range(1, ws.max_row + 1):
-            for c in range(1, ws.max_column + 1):
-                fill = ws.cell(row=r, column=c).fill
-                if fill and fill.start_color and fill.start_color.rgb == "00FFFF00":
-                    highlighted += 1
+        target = HIGHLIGHT_FILL.start_color.rgb
+        found = any(
+            cell.fill and cell.fill.start_color
+            and cell.fill.start_color.rgb == target
+            for row in ws.iter_rows() for cell in row
+        )
         wb.close()
-        assert highlighted > 0
+        assert found
@@ -1,12 +1,17 @@
 """Tests for the excel_to_python_vectorized converter."""
 
+import contextlib
+import io
 import json
 import os
 import subprocess
 import sys
 import tempfile
+import threading
 import shutil
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from string import ascii_uppercase
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font
@@ -31,17 +36,18 @@ from excel_to_python_vectorized.converter import convert_excel_to_python_vectori
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Column letters by 0-based position: _COLS[1] is "B"
+_COLS = tuple(ascii_uppercase)
+
+
 def _create_workbook_with_external_refs(path):
     """Create a workbook whose formulas mention an external file."""
     wb = Workbook()
     ws = wb.active
     ws.title = "Main"
-    ws["A1"] = "Local Value"
-    ws["B1"] = 100
     # Simulate external reference (openpyxl stores as string, not live link)
-    ws["C1"] = "=[ExtData.xlsx]Prices!A1*2"
-    ws["C2"] = "=[ExtData.xlsx]Prices!A2*2"
-    ws["D1"] = "=B1+10"
+    ws.append(["Local Value", 100, "=[ExtData.xlsx]Prices!A1*2", "=B1+10"])
+    ws.append([None, None, "=[ExtData.xlsx]Prices!A2*2"])
     wb.save(path)
     wb.close()
 
@@ -51,18 +57,11 @@ def _create_workbook_with_vertical_drag(path):
     wb = Workbook()
     ws = wb.active
     ws.title = "Data"
-    ws["A1"] = "Year"
-    ws["B1"] = "Revenue"
-    ws["C1"] = "Cost"
-    ws["D1"] = "Profit"
+    ws.append(["Year", "Revenue", "Cost", "Profit"])
     for r in range(2, 12):  # 10 rows of data
-        ws[f"A{r}"] = 2020 + r - 2
-        ws[f"B{r}"] = 1000 * r
-        ws[f"C{r}"] = 600 * r
-        ws[f"D{r}"] = f"=B{r}-C{r}"  # dragged formula
-    ws["D12"] = "=SUM(D2:D11)"
-    ws["B12"] = "=SUM(B2:B11)"
-    ws["C12"] = "=SUM(C2:C11)"
+        ws.append([2020 + r - 2, 1000 * r, 600 * r,
+                   f"=B{r}-C{r}"])  # dragged formula
+    ws.append([None, "=SUM(B2:B11)", "=SUM(C2:C11)", "=SUM(D2:D11)"])
     wb.save(path)
     wb.close()
 
@@ -72,15 +71,13 @@ def _create_workbook_with_horizontal_drag(path):
     wb = Workbook()
     ws = wb.active
     ws.title = "Forecast"
-    ws["A1"] = "Item"
-    ws["A2"] = "Base"
-    ws["A3"] = "Growth"
     # Years in columns B..F
-    for ci, year in enumerate(range(2024, 2029)):
-        col_letter = chr(66 + ci)  # B, C, D, E, F
-        ws[f"{col_letter}1"] = year
-        ws[f"{col_letter}2"] = 100 + ci * 10  # base values
-        ws[f"{col_letter}3"] = f"={col_letter}2*1.05"  # growth = base * 1.05
+    years = range(2024, 2029)
+    ws.append(["Item", *years])
+    ws.append(["Base", *(100 + ci * 10 for ci in range(len(years)))])
+    # growth = base * 1.05, dragged across B..F
+    ws.append(["Growth", *(f"={_COLS[1 + ci]}2*1.05"
+                           for ci in range(len(years)))])
     wb.save(path)
     wb.close()
 
@@ -90,19 +87,49 @@ def _create_workbook_with_cross_sheet(path):
     wb = Workbook()
     ws1 = wb.active
     ws1.title = "Revenue"
-    ws1["A1"] = "Q1"
-    ws1["A2"] = 1000
-    ws1["B1"] = "Q2"
-    ws1["B2"] = 1500
+    ws1.append(["Q1", "Q2"])
+    ws1.append([1000, 1500])
     ws2 = wb.create_sheet("Summary")
-    ws2["A1"] = "Total Revenue"
-    ws2["B1"] = "=Revenue!A2+Revenue!B2"
-    ws2["A2"] = "Double"
-    ws2["B2"] = "=B1*2"
+    ws2.append(["Total Revenue", "=Revenue!A2+Revenue!B2"])
+    ws2.append(["Double", "=B1*2"])
     wb.save(path)
     wb.close()
 
 
+# sys.argv and stdout are process-wide; one in-process script run at a time
+_INPROCESS_LOCK = threading.Lock()
+
+
+def _run_script_inprocess(script_path, template, result):
+    """Run a generated script as ``python script template result`` would.
+
+    The script is exec'd in a fresh ``__main__`` namespace with
+    ``sys.argv`` patched, which skips interpreter start-up and re-importing
+    openpyxl.  If it raises, it is re-run in a subprocess so the failure
+    is reported with the script's own stderr.  Returns a
+    ``subprocess.CompletedProcess`` either way.
+    """
+    argv = [script_path, template, result]
+    with open(script_path) as f:
+        code = compile(f.read(), script_path, "exec")
+    out = io.StringIO()
+    with _INPROCESS_LOCK:
+        saved_argv, sys.argv = sys.argv, argv
+        try:
+            with contextlib.redirect_stdout(out):
+                exec(code, {"__name__": "__main__", "__file__": script_path})
+        except (Exception, SystemExit):
+            failed = True
+        else:
+            failed = False
+        finally:
+            sys.argv = saved_argv
+    if failed:
+        return subprocess.run([sys.executable] + argv,
+                              capture_output=True, text=True, timeout=60)
+    return subprocess.CompletedProcess(argv, 0, out.getvalue(), "")
+
+
 # ---------------------------------------------------------------------------
 # Test: reference extraction
 # ---------------------------------------------------------------------------
@@ -158,6 +185,22 @@ class TestExtractReferences(unittest.TestCase):
         self.assertEqual(len(cell_refs), 1)
         self.assertEqual(cell_refs[0].col, "A")
 
+    def test_unquoted_non_ascii_sheet_ref(self):
+        refs = extract_references("=Données!A1+1", "Sheet1")
+        self.assertEqual([r.sheet for r in refs], ["Données"])
+
+    def test_quoted_sheet_with_double_quotes(self):
+        refs = extract_references('=\'Q1 "x"\'!A1&"B2"&C3', "Sheet1")
+        self.assertEqual([r.sheet for r in refs], ['Q1 "x"', "Sheet1"])
+        self.assertEqual([r.raw for r in refs], ['\'Q1 "x"\'!A1', "C3"])
+
+    def test_apostrophe_literal_beside_structured_ref(self):
+        refs = extract_references(
+            '=SUMIFS(Sales[Amount],Sales[Region],"North\'s")+Summary!B2',
+            "Sheet1")
+        self.assertEqual([(r.sheet, r.raw) for r in refs],
+                         [("Summary", "Summary!B2")])
+
 
 # ---------------------------------------------------------------------------
 # Test: pattern computation
@@ -242,6 +285,11 @@ class TestExternalFileDiscovery(unittest.TestCase):
         self.assertIn("Other.xlsx", ext)
         self.assertEqual(len(ext["ExtData.xlsx"]), 2)
 
+    def test_structured_ref_before_literal_is_not_external(self):
+        f = '=SUMIFS(Sales[Amount],Sales[Region],"North\'s")+Summary!B2'
+        ext = discover_external_files([("Sheet1", "D", 2, f, {})])
+        self.assertEqual(ext, {})
+
     def test_no_external(self):
         cells = [("Sheet1", "D", 2, "=B2*C2", {})]
         ext = discover_external_files(cells)
@@ -269,54 +317,97 @@ class TestAnalyseReferences(unittest.TestCase):
         self.assertEqual(len(analysis["external"]), 1)
         self.assertEqual(analysis["external"][0]["external_file"], "ExtData.xlsx")
 
+    def test_repeated_formula_classified_per_sheet(self):
+        """The same text is cross-sheet on one sheet but local on another."""
+        cells = [
+            ("Summary", "B", 1, "=Revenue!A2*2", {}),
+            ("Summary", "B", 2, "=Revenue!A2*2", {}),
+            ("Revenue", "C", 1, "=Revenue!A2*2", {}),
+        ]
+        analysis = analyse_references(cells)
+        self.assertEqual([c["cell"] for c in analysis["cross_sheet"]],
+                         ["B1", "B2"])
+
 
 # ---------------------------------------------------------------------------
 # End-to-end tests
 # ---------------------------------------------------------------------------
 
+# Input workbooks shared by the end-to-end classes, built once per module
+_WORKBOOK_CREATORS = {
+    "sample": create_sample_workbook,
+    "vertical": _create_workbook_with_vertical_drag,
+    "horizontal": _create_workbook_with_horizontal_drag,
+    "cross_sheet": _create_workbook_with_cross_sheet,
+    "with_ext": _create_workbook_with_external_refs,
+}
+MODULE_PATHS = {}
+_module_tmpdir = None
+
+
+def setUpModule():
+    global _module_tmpdir
+    _module_tmpdir = tempfile.mkdtemp()
+    for name in _WORKBOOK_CREATORS:
+        MODULE_PATHS[name] = os.path.join(_module_tmpdir, f"{name}.xlsx")
+    # The workbooks are independent, and saving overlaps in zlib, which
+    # releases the GIL; result() re-raises any creator's exception
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(create, MODULE_PATHS[name])
+                   for name, create in _WORKBOOK_CREATORS.items()]
+        for future in futures:
+            future.result()
+
+
+def tearDownModule():
+    shutil.rmtree(_module_tmpdir)
+    MODULE_PATHS.clear()
+
+
+def _convert_shared(cls, name, report_mode="sheetnames_only"):
+    """Bind workbook *name* to *cls* and convert it into a per-class dir.
+
+    The generated script's source is read once into ``cls.code`` for the
+    content and syntax checks.  By default the report is only summarised
+    (``cls.report`` maps sheet name to its ``A2`` value), not written.
+    """
+    cls.path = MODULE_PATHS[name]
+    cls.tmpdir = os.path.join(_module_tmpdir, f"{name}_out")
+    cls.script, cls.template, cls.ext_cfg, cls.report = (
+        convert_excel_to_python_vectorized(
+            cls.path, output_dir=cls.tmpdir, report_mode=report_mode))
+    with open(cls.script) as f:
+        cls.code = f.read()
+
+
 class TestEndToEndVectorized(unittest.TestCase):
     """Full pipeline: Excel → vectorised script → run → validate."""
 
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.sample_path = os.path.join(cls.tmpdir, "sample.xlsx")
-        create_sample_workbook(cls.sample_path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        # Convert once; every test inspects the same outputs
+        _convert_shared(cls, "sample", report_mode="workbook")
 
     def test_produces_all_files(self):
-        out = os.path.join(self.tmpdir, "out_files")
-        script, template, ext_cfg, report = convert_excel_to_python_vectorized(
-            self.sample_path, output_dir=out)
-        self.assertTrue(os.path.exists(script))
-        self.assertTrue(os.path.exists(template))
-        self.assertTrue(os.path.exists(report))
+        self.assertTrue(os.path.exists(self.script))
+        self.assertTrue(os.path.exists(self.template))
+        self.assertTrue(os.path.exists(self.report))
         # No external refs in sample → no config
-        self.assertIsNone(ext_cfg)
+        self.assertIsNone(self.ext_cfg)
 
     def test_generated_script_syntax(self):
-        out = os.path.join(self.tmpdir, "out_syntax")
-        script, *_ = convert_excel_to_python_vectorized(
-            self.sample_path, output_dir=out)
-        with open(script) as f:
-            code = f.read()
-        compile(code, script, "exec")
+        compile(self.code, self.script, "exec")
 
     def test_generated_script_runs_correctly(self):
-        out = os.path.join(self.tmpdir, "out_run")
-        script, template, *_ = convert_excel_to_python_vectorized(
-            self.sample_path, output_dir=out)
-        result_path = os.path.join(out, "result.xlsx")
+        # Kept as a real subprocess run: a smoke check of the CLI entry point
+        result_path = os.path.join(self.tmpdir, "result.xlsx")
         proc = subprocess.run(
-            [sys.executable, script, template, result_path],
+            [sys.executable, self.script, self.template, result_path],
             capture_output=True, text=True, timeout=60)
         self.assertEqual(proc.returncode, 0, f"Script failed:\n{proc.stderr}")
         self.assertTrue(os.path.exists(result_path))
 
-        wb = load_workbook(result_path, data_only=True)
+        wb = load_workbook(result_path, read_only=True, data_only=True)
         ws = wb["Inputs"]
         self.assertAlmostEqual(float(ws["D2"].value), 52.5, places=2)
         self.assertAlmostEqual(float(ws["D6"].value), 200.0, places=2)
@@ -336,19 +427,11 @@ class TestEndToEndVectorized(unittest.TestCase):
 
     def test_script_is_vectorised(self):
         """The generated script should contain ``for _r in`` loops."""
-        out = os.path.join(self.tmpdir, "out_vec")
-        script, *_ = convert_excel_to_python_vectorized(
-            self.sample_path, output_dir=out)
-        with open(script) as f:
-            code = f.read()
-        self.assertIn("for _r in", code)
-        self.assertIn("# Vectorised:", code)
+        self.assertIn("for _r in", self.code)
+        self.assertIn("# Vectorised:", self.code)
 
     def test_report_has_expected_sheets(self):
-        out = os.path.join(self.tmpdir, "out_report")
-        *_, report = convert_excel_to_python_vectorized(
-            self.sample_path, output_dir=out)
-        wb = load_workbook(report)
+        wb = load_workbook(self.report, read_only=True)
         self.assertIn("Summary", wb.sheetnames)
         self.assertIn("Vectorised Groups", wb.sheetnames)
         self.assertIn("Cross-Sheet Refs", wb.sheetnames)
@@ -356,31 +439,25 @@ class TestEndToEndVectorized(unittest.TestCase):
         self.assertIn("Per-Sheet Breakdown", wb.sheetnames)
         wb.close()
 
+    def test_unknown_report_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            convert_excel_to_python_vectorized(
+                self.path, output_dir=self.tmpdir, report_mode="pdf")
+
 
 class TestEndToEndVerticalDrag(unittest.TestCase):
     """Test with a workbook that has 10 dragged rows."""
 
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.path = os.path.join(cls.tmpdir, "vertical.xlsx")
-        _create_workbook_with_vertical_drag(cls.path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        _convert_shared(cls, "vertical")
 
     def test_runs_and_computes_correctly(self):
-        out = os.path.join(self.tmpdir, "out")
-        script, template, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        result = os.path.join(out, "result.xlsx")
-        proc = subprocess.run(
-            [sys.executable, script, template, result],
-            capture_output=True, text=True, timeout=60)
+        result = os.path.join(self.tmpdir, "result.xlsx")
+        proc = _run_script_inprocess(self.script, self.template, result)
         self.assertEqual(proc.returncode, 0, f"Failed:\n{proc.stderr}")
 
-        wb = load_workbook(result)
+        wb = load_workbook(result, read_only=True, data_only=True)
         ws = wb["Data"]
         # D2 = B2 - C2 = 2000 - 1200 = 800
         self.assertAlmostEqual(float(ws["D2"].value), 800, places=2)
@@ -392,40 +469,24 @@ class TestEndToEndVerticalDrag(unittest.TestCase):
         wb.close()
 
     def test_vectorisation_reduces_lines(self):
-        out = os.path.join(self.tmpdir, "out_lines")
-        script, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        with open(script) as f:
-            code = f.read()
         # 10 dragged formulas should be a single loop, not 10 separate blocks
-        self.assertIn("for _r in", code)
+        self.assertIn("for _r in", self.code)
         # Count occurrences of the loop pattern
-        self.assertLessEqual(code.count("for _r in"), 3)
+        self.assertLessEqual(self.code.count("for _r in"), 3)
 
 
 class TestEndToEndHorizontalDrag(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.path = os.path.join(cls.tmpdir, "horizontal.xlsx")
-        _create_workbook_with_horizontal_drag(cls.path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        _convert_shared(cls, "horizontal")
 
     def test_runs_correctly(self):
-        out = os.path.join(self.tmpdir, "out")
-        script, template, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        result = os.path.join(out, "result.xlsx")
-        proc = subprocess.run(
-            [sys.executable, script, template, result],
-            capture_output=True, text=True, timeout=60)
+        result = os.path.join(self.tmpdir, "result.xlsx")
+        proc = _run_script_inprocess(self.script, self.template, result)
         self.assertEqual(proc.returncode, 0, f"Failed:\n{proc.stderr}")
 
-        wb = load_workbook(result)
+        wb = load_workbook(result, read_only=True, data_only=True)
         ws = wb["Forecast"]
         # B3 = B2 * 1.05 = 100 * 1.05 = 105
         self.assertAlmostEqual(float(ws["B3"].value), 105.0, places=2)
@@ -434,37 +495,21 @@ class TestEndToEndHorizontalDrag(unittest.TestCase):
         wb.close()
 
     def test_has_horizontal_loop(self):
-        out = os.path.join(self.tmpdir, "out_h")
-        script, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        with open(script) as f:
-            code = f.read()
-        self.assertIn("for _ci in", code)
+        self.assertIn("for _ci in", self.code)
 
 
 class TestEndToEndCrossSheet(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.path = os.path.join(cls.tmpdir, "cross_sheet.xlsx")
-        _create_workbook_with_cross_sheet(cls.path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        _convert_shared(cls, "cross_sheet")
 
     def test_cross_sheet_values(self):
-        out = os.path.join(self.tmpdir, "out")
-        script, template, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        result = os.path.join(out, "result.xlsx")
-        proc = subprocess.run(
-            [sys.executable, script, template, result],
-            capture_output=True, text=True, timeout=60)
+        result = os.path.join(self.tmpdir, "result.xlsx")
+        proc = _run_script_inprocess(self.script, self.template, result)
         self.assertEqual(proc.returncode, 0, f"Failed:\n{proc.stderr}")
 
-        wb = load_workbook(result)
+        wb = load_workbook(result, read_only=True, data_only=True)
         ws = wb["Summary"]
         # B1 = Revenue!A2 + Revenue!B2 = 1000 + 1500 = 2500
         self.assertAlmostEqual(float(ws["B1"].value), 2500, places=2)
@@ -473,54 +518,28 @@ class TestEndToEndCrossSheet(unittest.TestCase):
         wb.close()
 
     def test_report_shows_cross_sheet(self):
-        out = os.path.join(self.tmpdir, "out_report")
-        *_, report = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        wb = load_workbook(report)
-        ws = wb["Cross-Sheet Refs"]
         # Should have at least one cross-sheet entry
-        self.assertIsNotNone(ws["A2"].value)
-        wb.close()
+        self.assertIsNotNone(self.report["Cross-Sheet Refs"])
 
 
 class TestEndToEndExternalRefs(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.tmpdir = tempfile.mkdtemp()
-        cls.path = os.path.join(cls.tmpdir, "with_ext.xlsx")
-        _create_workbook_with_external_refs(cls.path)
-
-    @classmethod
-    def tearDownClass(cls):
-        shutil.rmtree(cls.tmpdir)
+        _convert_shared(cls, "with_ext")
 
     def test_ext_config_generated(self):
-        out = os.path.join(self.tmpdir, "out")
-        _, _, ext_cfg, _ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        self.assertIsNotNone(ext_cfg)
-        self.assertTrue(os.path.exists(ext_cfg))
-        with open(ext_cfg) as f:
+        self.assertIsNotNone(self.ext_cfg)
+        self.assertTrue(os.path.exists(self.ext_cfg))
+        with open(self.ext_cfg) as f:
             cfg = json.load(f)
         self.assertIn("ExtData.xlsx", cfg)
 
     def test_report_shows_external(self):
-        out = os.path.join(self.tmpdir, "out_report")
-        *_, report = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        wb = load_workbook(report)
-        ws = wb["External Refs"]
-        self.assertIsNotNone(ws["A2"].value)
-        wb.close()
+        self.assertIsNotNone(self.report["External Refs"])
 
     def test_script_syntax_ok(self):
-        out = os.path.join(self.tmpdir, "out_syntax")
-        script, *_ = convert_excel_to_python_vectorized(
-            self.path, output_dir=out)
-        with open(script) as f:
-            code = f.read()
-        compile(code, script, "exec")
+        compile(self.code, self.script, "exec")
 
 
 if __name__ == "__main__":